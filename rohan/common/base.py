@@ -1,30 +1,56 @@
 import threading
-from abc    import ABC, abstractmethod
-from typing import Optional, List, Iterable, Any, Mapping, Callable
+from abc                        import ABC, abstractmethod
+from typing                     import Optional, List, Dict, Iterable, Any, Mapping, Callable
+from rohan.utils.scheduling     import ThreadPolicy, apply_thread_policy
+from rohan.common.tracing       import TRACER
+from rohan.utils.buffer_pool    import BufferPool
 
 class _RohanBase(ABC):
     """
     Base Class for rohan Modules
+    -- buffer_pool is the pool of the stack the module was entered by (None outside of stacks), from which per-tick arrays may be leased
     """
+
+    buffer_pool : Optional[BufferPool] = None
+
     def load(
         self,
         **kwargs,
     ):
         self.__dict__.update(kwargs)
 
+    def register_metrics( self, labels : Dict[str,Any] ) -> None:
+        """
+        Registers the module's metrics in rohan.common.metrics.REGISTRY -- called by stacks with the stack and component name the
+        module was entered under, so its series stay the same across re-spins
+        :param labels: Labels identifying the module
+        """
+
+    def unregister_metrics( self ) -> None:
+        """
+        Removes the module's metrics from the registry -- called by stacks when the module is unravelled
+        """
+
 class _RohanThreading(ABC):
     """
     Class for spinning off threads in rohan modules
+    -- join_timeout is the time stop_spin() waits on each thread before reporting it as stalled (None waits indefinitely),
+    and thread_policy is the scheduling policy applied by every thread of the module unless overridden per thread
     """
 
     sigterm         : threading.Event
     threads         : List[threading.Thread]
+    join_timeout    : Optional[float]           = 5.0
+    thread_policy   : Optional[ThreadPolicy]    = None
+    watchdog        : Optional[Any]     = None
+    watchdog_name   : Optional[str]     = None
     _instance_lock  : threading.Lock = threading.Lock() 
 
 
     def __init__( self ):
-        self.threads    = []
-        self.sigterm    = threading.Event()
+        self.threads        = []
+        self._thread_specs  = []
+        self.sigterm        = threading.Event()
 
     def add_threaded_method( 
         self,
@@ -32,30 +58,81 @@ class _RohanThreading(ABC):
         name    : Optional[str]                 = None,
         args    : Iterable[Any]                 = (),
         kwargs  : Optional[ Mapping[str, Any] ] = None,
+        policy  : Optional[ThreadPolicy]        = None,
     ):
-        self.threads.append( 
-            threading.Thread(
-                target  = target,
-                name    = name,
-                args    = args,
-                kwargs  = kwargs
-            )
+        """
+        Registers a method to be spun off in its own thread when start_spin() is called
+        :param target: Method run by the thread
+        :param name: Descriptive thread name (defaults to the module's process_name followed by the method name)
+        :param args: Positional arguments of the method
+        :param kwargs: Keyword arguments of the method
+        :param policy: Scheduling policy of this thread (defaults to the module's thread_policy)
+        """
+        if name is None:
+            name = f"{getattr(self,'process_name',type(self).__name__)} {getattr(target,'__name__','thread')}"
+        spec = dict( 
+            target  = self._run_threaded_method, 
+            name    = name, 
+            args    = ( target, policy, tuple(args), dict(kwargs or {}) ) 
         )
+        self._thread_specs.append( spec )
+        self.threads.append( threading.Thread( **spec ) )
+
+    def _run_threaded_method(
+        self,
+        target  : Callable[[],None],
+        policy  : Optional[ThreadPolicy],
+        args    : Iterable[Any],
+        kwargs  : Mapping[str, Any],
+    ) -> None:
+        """
+        Applies the thread's scheduling policy then runs its method
+        """
+        errors = apply_thread_policy( policy if policy is not None else self.thread_policy )
+        logger = getattr(self,"logger",self)
+        if errors and callable( getattr(logger,"write",None) ):
+            logger.write(
+                f'Scheduling policy of thread "{threading.current_thread().name}" not fully applied: {"; ".join(errors)}',
+                process_name=getattr(self,"process_name"," ")
+            )
+        target( *args, **kwargs )
 
     def start_spin( self ) -> None:
         """
-        Signal to start threaded processes
+        Signal to start threaded processes -- threads which already ran to completion are recreated so components may be restarted
         """
-        self.sigterm.clear()
-        for thread in self.threads:
-            if isinstance(thread,threading.Thread):
-                thread.start()
+        with TRACER.span( f"{getattr(self,'process_name',type(self).__name__)}.start_spin" ):
+            self.sigterm.clear()
+            for index, thread in enumerate(self.threads):
+                if isinstance(thread,threading.Thread):
+                    if thread.ident is not None and not thread.is_alive():
+                        thread = self.threads[index] = threading.Thread( **self._thread_specs[index] )
+                    if thread.ident is None:
+                        thread.start()
 
-    def stop_spin( self ) -> None:
+    def stop_spin( 
+        self,
+        timeout : Optional[float] = None,
+    ) -> List[str]:
         """
         Signal to stop threaded processes
-        """            
-        self.sigterm.set()
-        for thread in self.threads:
-            if isinstance(thread,threading.Thread) and thread.is_alive():
-                thread.join()
\ No newline at end of file
+        :param timeout: Time waited on each thread (defaults to join_timeout)
+        :returns Names of threads which did not join in time
+        """
+        timeout = self.join_timeout if timeout is None else timeout
+        with TRACER.span( f"{getattr(self,'process_name',type(self).__name__)}.stop_spin" ):
+            self.sigterm.set()
+            stalled = []
+            for thread in self.threads:
+                if isinstance(thread,threading.Thread) and thread.is_alive() and thread is not threading.current_thread():
+                    thread.join( timeout=timeout )
+                    if thread.is_alive():
+                        stalled.append( thread.name )
+        return stalled
+
+    def heartbeat( self ) -> None:
+        """
+        Signals liveness of the calling thread to the attached watchdog -- to be called once per iteration of spinning methods
+        """
+        if self.watchdog is not None:
+            self.watchdog.beat( self.watchdog_name )
\ No newline at end of file
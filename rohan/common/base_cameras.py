@@ -1,8 +1,17 @@
+import threading
 from abc                         import abstractmethod
 from rohan.common.base           import _RohanBase,_RohanThreading
 from rohan.common.logging        import Logger
-from typing                      import TypeVar, Optional
-from rohan.common.type_aliases   import Resolution
+from rohan.common.metrics        import REGISTRY, Counter
+from rohan.common.tracing        import TRACER
+from typing                      import TypeVar, Optional, Union, List, Dict, Any, Callable
+from rohan.common.type_aliases   import Resolution, Intrinsics, ROI
+from rohan.utils.deprojection    import DepthProjector
+from rohan.utils.preprocessing   import FramePipeline, CompiledPipeline, Crop, Decimate, Normalize
+from rohan.utils.change_detection import ChangeDetector
+from rohan.utils.buffer_pool     import Lease
+from rohan.utils.clock           import now, ClockAligner
+from numpy.typing                import NDArray
 
 SelfCameraBase = TypeVar("SelfCameraBase", bound="CameraBase" )
 class CameraBase(_RohanBase):
@@ -11,22 +20,43 @@ class CameraBase(_RohanBase):
     :param resolution: Pixel resolution of the camera's RGB channels
     :param fps: Frames-per-second (fps) of the camera's RGB channels
     :param logger: rohan Logger() instance
+    :param preprocessing: Optional preprocessing chain applied to frames passed through preprocess() or publish_frame()
     """
 
-    process_name : str = "unnamed camera"
-    resolution   : Resolution
-    fps          : int
-    logger       : Optional[Logger] = None
+    process_name        : str = "unnamed camera"
+    resolution          : Resolution
+    fps                 : int
+    logger              : Optional[Logger] = None
+    frame_seq           : int = 0
+    frame_condition     : Optional[threading.Condition] = None
+    frame               : Optional[NDArray] = None
+    preprocessing       : Optional[FramePipeline] = None
+    compiled_pipeline   : Optional[CompiledPipeline] = None
+    quality_steps       : tuple = ()
+    frames_metric       : Optional[Counter] = None
+    change_detector     : Optional[ChangeDetector] = None
+    change_seq          : int = 0
+    frame_changed       : bool = True
+    frame_time          : Optional[float] = None
+    clock_aligner       : Optional[ClockAligner] = None
+    _frame_lease        : Optional[Lease] = None
+    _compiled_quality   : Optional[tuple] = None
 
     def __init__(   
         self, 
-        resolution  : Resolution,
-        fps         : int,
-        logger      : Optional[Logger] = None
+        resolution      : Resolution,
+        fps             : int,
+        logger          : Optional[Logger] = None,
+        preprocessing   : Optional[FramePipeline] = None,
     ):
-        self.resolution = resolution
-        self.fps        = fps
-        self.logger     = logger
+        self.resolution         = resolution
+        self.fps                = fps
+        self.logger             = logger
+        self.preprocessing      = preprocessing
+        self.compiled_pipeline  = None
+        self.quality_steps      = ()
+        self.frame              = None
+        self.frames_metric      = None
 
     def __enter__( self ):
         self.connect()
@@ -38,12 +68,48 @@ class CameraBase(_RohanBase):
         return self
     
     def __exit__( self, exception_type, exception_value, traceback ):
+        self._unravel( release_buffers=True )
+
+    def _unravel( self, release_buffers : bool ) -> None:
+        """
+        Disconnects the camera and, unless told otherwise, returns its buffers to their pool
+        :param release_buffers: Whether to release the buffers -- False when a capture thread may still be writing into them
+        """
         self.disconnect()
+        if release_buffers:
+            self.release_buffers()
         if isinstance(self.logger,Logger): 
             self.logger.write(
                 f'Camera Disconnected',
                 process_name=self.process_name
             )
+
+    def register_metrics( self, labels : Dict[str,Any] ) -> None:
+        """
+        Registers the camera's frame counter under the given labels along with its process_name
+        """
+        self.unregister_metrics()
+        self.frames_metric = REGISTRY.counter( 
+            "rohan_camera_frames_total", 
+            "Frames signalled by cameras", 
+            labels={ **labels, "camera" : self.process_name }
+        )
+
+    def unregister_metrics( self ) -> None:
+        if self.frames_metric is not None:
+            REGISTRY.unregister( self.frames_metric )
+            self.frames_metric = None
+
+    def release_buffers( self ) -> None:
+        """
+        Returns the buffers leased by the camera's preprocessing pipeline to their pool -- the latest frame is dropped with them
+        """
+        self._swap_pipeline( None )
+        self._compiled_quality  = None
+        self.frame              = None
+        if self._frame_lease is not None:
+            self._frame_lease.release()
+            self._frame_lease = None
     
     @abstractmethod
     def connect( self ) -> None:
@@ -57,6 +123,163 @@ class CameraBase(_RohanBase):
         Disconnect from the camera's I/O
         """
 
+    def health_check( self ) -> bool:
+        """
+        Checks a camera kept connected across stack instances is still usable before it is adopted (see keep_connections)
+        -- cameras should override this with a cheap liveness probe of their I/O
+        :returns True if the camera can be adopted without reconnecting
+        """
+        return True
+
+    def preprocess( self, frame : NDArray ) -> NDArray:
+        """
+        Runs the camera's preprocessing chain on a raw frame -- the chain is compiled for the camera's resolution on the first frame
+        and recompiled whenever set_quality() published new quality steps or the camera was handed a new buffer_pool
+        :param frame: Raw frame of shape (height, width) or (height, width, channels)
+        :returns Preprocessed frame held in a pooled buffer (the raw frame if no preprocessing is attached)
+        """
+        pipeline        = self.compiled_pipeline
+        quality_steps   = self.quality_steps
+        if quality_steps is not self._compiled_quality or ( pipeline is not None and pipeline.buffer_pool is not self.buffer_pool ):
+            pipeline = self._compile_pipeline( frame, quality_steps )
+        return pipeline( frame ) if pipeline is not None else frame
+
+    def _compile_pipeline( 
+        self, 
+        frame           : NDArray,
+        quality_steps   : tuple,
+    ) -> Optional[CompiledPipeline]:
+        """
+        Compiles the preprocessing chain with the given quality steps for the shape and dtype of a raw frame
+        -- quality steps which do not fit the frame are logged and the previous pipeline kept, so a misfit quality level does not
+        take down the capture thread
+        :returns The pipeline to run (None if neither preprocessing nor quality steps are set)
+        """
+        self._compiled_quality = quality_steps
+        steps = list(self.preprocessing.steps) if self.preprocessing is not None else []
+        if not steps and not quality_steps:
+            return self._swap_pipeline( None )
+        # >> NOTE: Quality steps act on the user's preprocessed geometry, so they go after it but ahead of any normalization
+        position = len(steps) - 1 if steps and isinstance(steps[-1],Normalize) else len(steps)
+        try:
+            pipeline = self._build_pipeline( frame, steps[:position] + list(quality_steps) + steps[position:] )
+        except ValueError as e:
+            if not quality_steps:
+                raise
+            if isinstance(self.logger,Logger): 
+                self.logger.write(
+                    f'Quality steps {quality_steps} do not fit the camera ({e}) ... keeping the previous preprocessing',
+                    process_name=self.process_name
+                )
+            pipeline = self.compiled_pipeline
+            if pipeline is not None and pipeline.buffer_pool is self.buffer_pool:
+                return pipeline
+            if not steps:
+                return self._swap_pipeline( None )
+            pipeline = self._build_pipeline( frame, steps )
+        return self._swap_pipeline( pipeline )
+
+    def _swap_pipeline( 
+        self, 
+        pipeline : Optional[CompiledPipeline],
+    ) -> Optional[CompiledPipeline]:
+        """
+        Replaces the compiled pipeline and returns the buffers of the previous one to their pool
+        -- the published frame keeps its own reference (see publish_frame()), so it stays valid until the next frame replaces it
+        """
+        previous, self.compiled_pipeline = self.compiled_pipeline, pipeline
+        if previous is not None and previous is not pipeline:
+            previous.release()
+        return pipeline
+
+    def _build_pipeline( 
+        self, 
+        frame   : NDArray,
+        steps   : List,
+    ) -> CompiledPipeline:
+        return (
+            FramePipeline( steps=steps, pool_size=self.preprocessing.pool_size ) if self.preprocessing is not None 
+            else FramePipeline( steps=steps )
+        ).compile(
+            resolution  = self.resolution,
+            channels    = frame.shape[2] if frame.ndim == 3 else None,
+            dtype       = frame.dtype,
+            buffer_pool = self.buffer_pool,
+        )
+
+    def set_quality( 
+        self, 
+        decimation  : int = 1,
+        roi         : Optional[ROI] = None,
+    ) -> None:
+        """
+        Adjusts the decimation and region of interest applied on top of the camera's preprocessing -- the chain is recompiled on the next frame
+        :param decimation: Integer decimation of rows and columns
+        :param roi: Optional region of interest (x, y, width, height) of the preprocessed frame
+        """
+        steps = ( () if roi is None else ( Crop(tuple(roi)), ) ) + ( () if decimation == 1 else ( Decimate(decimation), ) )
+        if steps != self.quality_steps:
+            # >> NOTE: The steps are published as a single immutable tuple which the capture thread compares by identity, so no
+            # update is lost to a recompilation already in progress
+            self.quality_steps = steps
+
+    def publish_frame( 
+        self, 
+        frame       : NDArray,
+        device_time : Optional[float] = None,
+    ) -> None:
+        """
+        Preprocesses a raw frame, makes it available as the camera's latest frame and signals its arrival
+        -- intended to be called from the capture thread so process() receives ready-to-use frames
+        -- with a change detector attached (see StackConfiguration.change_gating), frame_changed tells whether the raw frame differs
+        from the last changed one and change_seq counts changed frames
+        :param frame: Raw frame of shape (height, width) or (height, width, channels)
+        :param device_time: Optional hardware timestamp of the frame, mapped onto the rohan clock through the camera's clock_aligner
+        (created on first use with a device scale of 1 s -- assign a ClockAligner with the device's tick length beforehand otherwise)
+        """
+        stamp = now()
+        if device_time is not None:
+            if self.clock_aligner is None:
+                self.clock_aligner = ClockAligner()
+            stamp = self.clock_aligner.align( device_time, host_time=stamp )
+        detector = self.change_detector
+        if detector is not None:
+            self.frame_changed = detector.update( frame )
+            if self.frame_changed:
+                self.change_seq += 1
+        self.frame  = self.preprocess( frame )
+        pipeline    = self.compiled_pipeline
+        lease       = pipeline.last_lease if pipeline is not None else None
+        # >> NOTE: The published frame holds a reference on its buffer, so a recompilation cannot return it to the pool (where
+        # another component could lease and overwrite it) while process() is still reading it
+        if lease is not None:
+            lease.retain()
+        previous, self._frame_lease = self._frame_lease, lease
+        if previous is not None:
+            previous.release()
+        self.signal_frame( stamp=stamp )
+
+    def signal_frame( 
+        self, 
+        stamp : Optional[float] = None 
+    ) -> None:
+        """
+        Signals that a new frame is available -- to be called by the camera (typically from its capture thread) after each new frame
+        so stacks spinning on frame arrival wake up
+        :param stamp: Capture time of the frame on the rohan clock (defaults to now), made available as frame_time
+        """
+        self.frame_time = now() if stamp is None else stamp
+        if self.frames_metric is not None:
+            self.frames_metric.inc()
+        TRACER.instant( f"{self.process_name} frame" )
+        condition = self.frame_condition
+        if condition is None:
+            self.frame_seq += 1
+            return
+        with condition:
+            self.frame_seq += 1
+            condition.notify_all()
+
 SelfThreadedCameraBase = TypeVar("SelfThreadedCameraBaseModel", bound="ThreadedCameraBase" )
 class ThreadedCameraBase(CameraBase,_RohanThreading):
     """
@@ -64,21 +287,24 @@ class ThreadedCameraBase(CameraBase,_RohanThreading):
     :param resolution: Pixel resolution of the camera's RGB channels
     :param fps: Frames-per-second (fps) of the camera's RGB channels
     :param logger: rohan Logger() instance
+    :param preprocessing: Optional preprocessing chain applied to frames passed through preprocess() or publish_frame()
     """
 
     process_name : str = "unnamed threaded camera"
 
     def __init__(   
         self, 
-        resolution  : Resolution,
-        fps         : int,
-        logger      : Optional[Logger] = None
+        resolution      : Resolution,
+        fps             : int,
+        logger          : Optional[Logger] = None,
+        preprocessing   : Optional[FramePipeline] = None,
     ):
         CameraBase.__init__(
             self,
             resolution=resolution,
             fps=fps,
-            logger=logger
+            logger=logger,
+            preprocessing=preprocessing,
         )
         _RohanThreading.__init__( self )
 
@@ -93,17 +319,85 @@ class ThreadedCameraBase(CameraBase,_RohanThreading):
         return self
     
     def __exit__( self, exception_type, exception_value, traceback ):
-        self.stop_spin()
+        stalled = self.stop_spin()
         if isinstance(self.logger,Logger): 
+            if stalled:
+                self.logger.write(
+                    f'Thread(s) {stalled} did not join within {self.join_timeout} s ... keeping their buffers leased',
+                    process_name=self.process_name
+                )
             self.logger.write(
                 f'Unravelling camera thread',
                 process_name=self.process_name
             )
-        CameraBase.__exit__( self, exception_type, exception_value, traceback )
+        # >> NOTE: A stalled capture thread may still write into the pipeline's buffers, so they are not handed back to the pool
+        self._unravel( release_buffers=not stalled )
+
+    def health_check( self ) -> bool:
+        """
+        Checks the camera's threads are still running on top of CameraBase.health_check()
+        """
+        return CameraBase.health_check( self ) and all( thread.is_alive() for thread in self.threads )
+
+
+class _LidarChannel:
+    """
+    Depth channel shared by the lidar camera bases -- holds the depth channel's configuration and deprojects its frames through a
+    DepthProjector leasing from the camera's buffer pool
+    """
+
+    lidar_resolution    : Resolution
+    lidar_fps           : int
+    intrinsics          : Optional[Intrinsics]      = None
+    depth_projector     : Optional[DepthProjector]  = None
+
+    def _init_lidar(
+        self,
+        lidar_resolution    : Resolution,
+        lidar_fps           : int,
+        intrinsics          : Optional[Intrinsics],
+        depth_scale         : float,
+    ) -> None:
+        self.lidar_resolution   = lidar_resolution
+        self.lidar_fps          = lidar_fps
+        self.intrinsics         = intrinsics
+        self.depth_projector    = (
+            DepthProjector( resolution=lidar_resolution, intrinsics=intrinsics, depth_scale=depth_scale ) 
+            if intrinsics is not None else None
+        )
+
+    def deproject(
+        self,
+        depth   : NDArray,
+        stride  : int               = 1,
+        roi     : Optional[ROI]     = None,
+        out     : Optional[NDArray] = None,
+    ) -> NDArray:
+        """
+        Projects a depth frame into a point cloud using the cached ray table of the camera's lidar_resolution and intrinsics
+        -- without out, the returned buffer is reused by the next call
+        :param depth: Depth frame of shape (height, width) of lidar_resolution
+        :param stride: Integer decimation of rows and columns
+        :param roi: Optional region of interest (x, y, width, height) in pixels
+        :param out: Optional float32 output array of shape (n_points, 3)
+        :returns Point cloud of shape (n_points, 3)
+        """
+        if self.depth_projector is None:
+            raise RuntimeError(f"{self.process_name} cannot deproject depth frames as no intrinsics were provided")
+        self.depth_projector.buffer_pool = self.buffer_pool
+        return self.depth_projector.project( depth, stride=stride, roi=roi, out=out )
+
+    def release_buffers( self ) -> None:
+        """
+        Returns the buffers leased by the camera's preprocessing pipelines and depth projector to their pool
+        """
+        CameraBase.release_buffers( self )
+        if self.depth_projector is not None:
+            self.depth_projector.release()
 
 
 SelfLidarCameraBase = TypeVar("SelfLidarCameraBase", bound="LidarCameraBase" )
-class LidarCameraBase(CameraBase):
+class LidarCameraBase(_LidarChannel,CameraBase):
     """
     Base class for an arbitrary lidar camera model spinning up a threaded method
     :param resolution: Pixel resolution of the camera's RGB channels
@@ -111,11 +405,12 @@ class LidarCameraBase(CameraBase):
     :param fps: Frames-per-second (fps) of the camera's RGB channels
     :param lidar_fps: Frames-per-second (fps) of the camera's depth channel
     :param logger: rohan Logger() instance
+    :param intrinsics: Optional pinhole intrinsics (fx, fy, cx, cy) of the depth channel used by deproject()
+    :param depth_scale: Conversion of raw depth values to metric depth used by deproject()
+    :param preprocessing: Optional preprocessing chain applied to RGB frames passed through preprocess() or publish_frame()
     """
 
-    process_name        : str = "unnamed lidar camera"
-    lidar_resolution    : Resolution
-    lidar_fps           : int
+    process_name : str = "unnamed lidar camera"
 
     def __init__(   
         self, 
@@ -124,19 +419,22 @@ class LidarCameraBase(CameraBase):
         fps : int, 
         lidar_fps : int,
         logger : Optional[Logger] = None,  
+        intrinsics : Optional[Intrinsics] = None,
+        depth_scale : float = 1.0,
+        preprocessing : Optional[FramePipeline] = None,
     ):
         CameraBase.__init__( 
             self,
             resolution=resolution, 
             fps=fps, 
-            logger=logger 
+            logger=logger,
+            preprocessing=preprocessing,
         )
-        self.lidar_resolution   = lidar_resolution
-        self.lidar_fps          = lidar_fps
+        self._init_lidar( lidar_resolution, lidar_fps, intrinsics, depth_scale )
 
 
 SelfThreadedLidarCameraBase = TypeVar("SelfThreadedLidarCameraBase", bound="ThreadedLidarCameraBase" )
-class ThreadedLidarCameraBase(ThreadedCameraBase):
+class ThreadedLidarCameraBase(_LidarChannel,ThreadedCameraBase):
     """
     Base class for an arbitrary lidar camera model
     :param resolution: Pixel resolution of the camera's RGB channels
@@ -144,11 +442,12 @@ class ThreadedLidarCameraBase(ThreadedCameraBase):
     :param fps: Frames-per-second (fps) of the camera's RGB channels
     :param lidar_fps: Frames-per-second (fps) of the camera's depth channel
     :param logger: rohan Logger() instance
+    :param intrinsics: Optional pinhole intrinsics (fx, fy, cx, cy) of the depth channel used by deproject()
+    :param depth_scale: Conversion of raw depth values to metric depth used by deproject()
+    :param preprocessing: Optional preprocessing chain applied to RGB frames passed through preprocess() or publish_frame()
     """
 
-    process_name        : str = "unnamed threaded lidar camera"
-    lidar_resolution    : Resolution
-    lidar_fps           : int
+    process_name : str = "unnamed threaded lidar camera"
 
     def __init__(   
         self, 
@@ -157,12 +456,109 @@ class ThreadedLidarCameraBase(ThreadedCameraBase):
         fps : int, 
         lidar_fps : int,
         logger : Optional[Logger] = None,  
+        intrinsics : Optional[Intrinsics] = None,
+        depth_scale : float = 1.0,
+        preprocessing : Optional[FramePipeline] = None,
     ):
         ThreadedCameraBase.__init__( 
             self,
             resolution=resolution, 
             fps=fps, 
-            logger=logger 
+            logger=logger,
+            preprocessing=preprocessing,
         )
-        self.lidar_resolution   = lidar_resolution
-        self.lidar_fps          = lidar_fps
\ No newline at end of file
+        self._init_lidar( lidar_resolution, lidar_fps, intrinsics, depth_scale )
+
+
+class FrameTrigger:
+
+    """
+    Wakes a stack on camera frame arrival rather than on a fixed interval
+    :param mode: "any" to wake on a new frame from any watched camera, "all" to wake once every watched camera has a new frame,
+    or the name(s) of specific cameras within the stack (e.g. "camera", "camera[0]" or "camera[left]") of which all must have a new frame
+    :param poll_intrvl: Longest single wait before checking whether waiting should be aborted
+    """
+
+    mode        : Union[str,List[str]]
+    condition   : threading.Condition
+    cameras     : Dict[str,CameraBase]
+    woken       : int = 0
+    timeouts    : int = 0
+
+    def __init__(
+        self,
+        mode        : Union[str,List[str]] = "any",
+        poll_intrvl : float = 0.05,
+    ):
+        self.mode           = mode
+        self.poll_intrvl    = poll_intrvl
+        self.condition      = threading.Condition()
+        self.cameras        = {}
+        self._seen          : Dict[str,int] = {}
+        self.woken          = 0
+        self.timeouts       = 0
+
+    def watch( 
+        self, 
+        name    : str, 
+        camera  : CameraBase 
+    ) -> None:
+        """
+        Attaches a camera to the trigger if it is selected by the trigger's mode
+        :param name: Name of the camera within the stack
+        :param camera: Camera instance
+        """
+        if self.mode not in ("any","all"):
+            selected = [ self.mode ] if isinstance(self.mode,str) else list(self.mode)
+            if name not in selected:
+                return
+        camera.frame_condition  = self.condition
+        self.cameras[name]      = camera
+        self._seen[name]        = camera.frame_seq
+
+    def validate( self ) -> None:
+        """
+        Ensures every camera requested by the trigger's mode is watched
+        :raises ValueError: if no camera or a requested camera is not watched
+        """
+        if self.mode in ("any","all"):
+            if not self.cameras:
+                raise ValueError("Frame triggered spinning requires at least one camera")
+            return
+        selected = [ self.mode ] if isinstance(self.mode,str) else list(self.mode)
+        missing = [ name for name in selected if name not in self.cameras ]
+        if missing:
+            raise ValueError(f"Frame trigger requested camera(s) {missing} which are not part of the stack: Available are {list(self.cameras)}")
+
+    def _ready( self ) -> bool:
+        fresh = [ camera.frame_seq != self._seen[name] for name, camera in self.cameras.items() ]
+        return any(fresh) if self.mode == "any" else all(fresh)
+
+    def wait( 
+        self,
+        timeout : float = -1,
+        abort   : Optional[Callable[[],bool]] = None,
+    ) -> bool:
+        """
+        Waits for new frames according to the trigger's mode
+        :param timeout: Longest time to wait before returning regardless of frame arrival (non-positive waits indefinitely)
+        :param abort: Optional callable returning True when waiting should stop early (e.g. the stack spinning down)
+        :returns True if woken by frame arrival, False if the timeout passed or waiting was aborted
+        """
+        deadline = now() + timeout if timeout > 0 else None
+        with self.condition:
+            while not self._ready():
+                if abort is not None and abort():
+                    return False
+                wait_time = self.poll_intrvl
+                if deadline is not None:
+                    remaining = deadline - now()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        return False
+                    wait_time = min( wait_time, remaining )
+                self.condition.wait( timeout=wait_time )
+            for name, camera in self.cameras.items():
+                self._seen[name] = camera.frame_seq
+        self.woken += 1
+        return True
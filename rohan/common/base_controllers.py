@@ -1,7 +1,12 @@
-from rohan.common.base       import _RohanBase, _RohanThreading
-from abc                     import abstractmethod
-from rohan.common.logging    import Logger
-from typing                  import Optional, TypeVar
+from rohan.common.base           import _RohanBase, _RohanThreading
+from abc                         import abstractmethod
+from rohan.common.logging        import Logger
+from rohan.common.type_aliases   import Joints
+from rohan.utils.timers          import DeadlineTimer, IntervalTimer
+from rohan.utils.clock           import now
+from typing                      import Optional, TypeVar, List, Dict, Any, Union, Type, Tuple
+from numpy.typing                import NDArray
+import numpy as np
 
 
 SelfControllerBase = TypeVar("SelfControllerBase", bound="ControllerBase" )
@@ -77,10 +82,238 @@ class ThreadedControllerBase(ControllerBase,_RohanThreading):
         return self
     
     def __exit__( self, exception_type, exception_value, traceback ):
-        self.stop_spin()
+        stalled = self.stop_spin()
         if isinstance(self.logger,Logger): 
+            if stalled:
+                self.logger.write(
+                    f'Thread(s) {stalled} did not join within {self.join_timeout} s',
+                    process_name=self.process_name
+                )
             self.logger.write(
                 f'Unravelling controller thread',
                 process_name=self.process_name
             )
         ControllerBase.__exit__( self, exception_type, exception_value, traceback )
+
+
+SelfFixedRateControllerBase = TypeVar("SelfFixedRateControllerBase", bound="FixedRateControllerBase" )
+class FixedRateControllerBase(ThreadedControllerBase):
+    """
+    Base class for an arbitrary manipulator controller running a fixed-rate control loop
+    -- the loop calls control_step() on a deadline grid independent of the stack rate with the latest published setpoint
+    :param logger: rohan Logger() instance
+    :param control_intrvl: Inverse-frequency of the control loop
+    :param overrun_report_intrvl: Minimum time between logged reports of control loop overruns
+    """
+
+    process_name            : str = "unnamed fixed-rate controller"
+    control_intrvl          : float
+    overrun_report_intrvl   : float
+    control_timer           : DeadlineTimer
+    _setpoint               : Tuple[Optional[Any],Optional[float]] = (None,None)
+    
+    def __init__( 
+        self,
+        control_intrvl          : float,
+        logger                  : Optional[Logger] = None,
+        overrun_report_intrvl   : float = 1.0,
+    ):
+        if control_intrvl <= 0:
+            raise ValueError(f"Fixed-rate controllers require a positive control_intrvl: Provided {control_intrvl}")
+        ThreadedControllerBase.__init__( self, logger=logger )
+        self.control_intrvl         = control_intrvl
+        self.overrun_report_intrvl  = overrun_report_intrvl
+        self.control_timer          = DeadlineTimer( interval=control_intrvl )
+        self._setpoint              = (None,None)
+        self.add_threaded_method( target=self.control_loop, name=f"{self.process_name} control loop" )
+
+    def publish_setpoint( self, setpoint : Any ) -> None:
+        """
+        Publishes the setpoint tracked by the control loop -- safe to call from the stack thread at any rate
+        :param setpoint: Latest setpoint determined by guidance/navigation
+        """
+        # >> NOTE: Single reference assignment, so the control loop never observes a setpoint without its stamp
+        self._setpoint = ( setpoint, now() )
+
+    def get_setpoint( self ) -> Tuple[Optional[Any],Optional[float]]:
+        """
+        Reads the latest published setpoint without blocking
+        :returns Tuple of the latest setpoint and the time it was published (None, None if nothing has been published)
+        """
+        return self._setpoint
+
+    @property
+    def overruns( self ) -> int:
+        """
+        Number of control loop deadlines missed since the loop was spun up
+        """
+        return self.control_timer.overruns
+
+    @abstractmethod
+    def control_step( 
+        self, 
+        setpoint    : Optional[Any],
+        dt          : float,
+    ) -> None:
+        """
+        Single iteration of the fixed-rate control loop
+        :param setpoint: Latest published setpoint (None if nothing has been published yet)
+        :param dt: Time passed since the previous iteration
+        """
+
+    def control_loop( self ) -> None:
+        """
+        Fixed-rate control loop decoupled from the stack rate
+        """
+        report_timer        = IntervalTimer( interval=self.overrun_report_intrvl )
+        reported_overruns   = 0
+        self.control_timer.reset()
+        last_tick           = now()
+        while not self.sigterm.is_set():
+            self.control_timer.await_deadline()
+            self.heartbeat()
+            tick        = now()
+            setpoint, _ = self._setpoint
+            self.control_step( setpoint=setpoint, dt=tick-last_tick )
+            last_tick   = tick
+
+            if self.control_timer.overruns > reported_overruns and report_timer.check_interval():
+                if isinstance(self.logger,Logger): 
+                    self.logger.write(
+                        f'Control loop missed {self.control_timer.overruns - reported_overruns} deadline(s) '
+                        f'(total {self.control_timer.overruns}, worst lateness {1e3*self.control_timer.max_lateness:.3f} ms)',
+                        process_name=self.process_name
+                    )
+                reported_overruns = self.control_timer.overruns
+
+
+SelfBatchedControllerBase = TypeVar("SelfBatchedControllerBase", bound="BatchedControllerBase" )
+class BatchedControllerBase(ControllerBase):
+    """
+    Base class for an arbitrary manipulator controller whose control law may be stepped for many arms at once
+    -- controllers of the same class are grouped by the stack and stepped with a single call to step_batch()
+    :param logger: rohan Logger() instance
+    """
+
+    process_name    : str = "unnamed batched controller"
+    n_joints        : int
+
+    @abstractmethod
+    def get_state( self ) -> Joints:
+        """
+        Provides the current joint state of this arm
+        :returns Joint state of length n_joints
+        """
+
+    @abstractmethod
+    def set_command( self, command : NDArray ) -> None:
+        """
+        Sends the command determined for this arm
+        :param command: Row of the batched command array belonging to this arm
+        """
+
+    @classmethod
+    @abstractmethod
+    def step_batch( 
+        cls, 
+        states      : NDArray,
+        controllers : List["BatchedControllerBase"]
+    ) -> NDArray:
+        """
+        Vectorized control law for every arm of this class
+        :param states: Stacked joint states of shape (n_arms, n_joints)
+        :param controllers: Controllers in the same row order as states
+        :returns Stacked commands with leading dimension n_arms
+        """
+
+
+class ControllerBatch:
+    """
+    Group of batched controllers of the same class stepped with one vectorized call
+    :param controllers: Controllers of identical class and number of joints
+    :param keys: Optional list/dict keys the controllers were declared with in the stack configuration
+    """
+
+    controller_class    : Type[BatchedControllerBase]
+    controllers         : List[BatchedControllerBase]
+    keys                : List[Any]
+    states              : NDArray
+    commands            : Optional[NDArray] = None
+
+    def __init__(
+        self,
+        controllers : List[BatchedControllerBase],
+        keys        : Optional[List[Any]] = None,
+    ):
+        if len(controllers) == 0:
+            raise ValueError("ControllerBatch requires at least one controller")
+        self.controller_class   = type(controllers[0])
+        if any( type(controller) is not self.controller_class for controller in controllers ):
+            raise TypeError(f"All controllers of a batch must be of class {self.controller_class}")
+        n_joints = { controller.n_joints for controller in controllers }
+        if len(n_joints) != 1:
+            raise ValueError(f"All controllers of a batch must share n_joints: Provided {sorted(n_joints)}")
+        self.controllers    = controllers
+        self.keys           = list(range(len(controllers))) if keys is None else list(keys)
+        self.states         = np.zeros( ( len(controllers), n_joints.pop() ), dtype=np.float64 )
+
+    def __len__( self ) -> int:
+        return len(self.controllers)
+
+    def gather( self ) -> NDArray:
+        """
+        Stacks the arm states into the preallocated (n_arms, n_joints) array
+        :returns Stacked joint states
+        """
+        for row, controller in enumerate(self.controllers):
+            self.states[row,:] = controller.get_state()
+        return self.states
+
+    def scatter( self, commands : NDArray ) -> None:
+        """
+        Sends each row of the batched command array back to its arm
+        :param commands: Stacked commands with leading dimension n_arms
+        """
+        for row, controller in enumerate(self.controllers):
+            controller.set_command( commands[row] )
+
+    def step( self ) -> NDArray:
+        """
+        Gathers states, steps the control law once for every arm, then scatters commands
+        :returns Stacked commands with leading dimension n_arms
+        """
+        self.commands = self.controller_class.step_batch( self.gather(), self.controllers )
+        self.scatter( self.commands )
+        return self.commands
+
+
+def batch_controllers(
+    controllers : Optional[ Union[ ControllerBase, List[ControllerBase], Dict[Any,ControllerBase] ] ]
+) -> List[ControllerBatch]:
+    """
+    Groups batched controllers of the same class (and number of joints) into ControllerBatch objects
+    -- controllers not inheriting BatchedControllerBase are left for the stack to call directly
+    :param controllers: Controller context(s) entered by the stack
+    :returns List of controller batches in order of first appearance
+    """
+    if controllers is None:
+        return []
+    if isinstance(controllers,Dict):
+        items = list(controllers.items())
+    elif isinstance(controllers,List):
+        items = list(enumerate(controllers))
+    else:
+        items = [ (None, controllers) ]
+
+    groups : Dict[Any,List] = {}
+    for key, controller in items:
+        if isinstance(controller,BatchedControllerBase):
+            groups.setdefault( ( type(controller), controller.n_joints ), [] ).append( (key, controller) )
+
+    return [
+        ControllerBatch( 
+            controllers = [ controller for _, controller in group ],
+            keys        = [ key for key, _ in group ]
+        )
+        for group in groups.values()
+    ]
@@ -1,7 +1,9 @@
-from rohan.common.base       import _RohanBase, _RohanThreading
-from abc                     import abstractmethod
-from rohan.common.logging    import Logger
-from typing                  import Optional, TypeVar
+from rohan.common.base           import _RohanBase, _RohanThreading
+from abc                         import abstractmethod
+from rohan.common.logging        import Logger
+from rohan.utils.trajectories    import Trajectory, TrajectoryCache, min_jerk_trajectory
+from typing                      import Optional, TypeVar, Dict
+from numpy.typing                import ArrayLike
 
 
 SelfGuidanceBase = TypeVar("SelfGuidanceBase", bound="GuidanceBase" )
@@ -9,16 +11,24 @@ class GuidanceBase(_RohanBase):
     """
     Base class for an arbitrary manipulator guidance
     :param logger: rohan Logger() instance
+    :param trajectory_dt: Time between samples of trajectories precomputed by plan_trajectory()
+    :param trajectory_cache_size: Number of precomputed trajectories kept in the LRU cache
     """
 
-    process_name    : str = "unnamed guidance"
-    logger          : Optional[Logger]
+    process_name        : str = "unnamed guidance"
+    logger              : Optional[Logger]
+    trajectory_dt       : float
+    trajectory_cache    : TrajectoryCache
 
     def __init__( 
         self,
-        logger : Optional[Logger] = None  
+        logger                  : Optional[Logger] = None,
+        trajectory_dt           : float = 0.01,
+        trajectory_cache_size   : int   = 32,
     ):
-        self.logger = logger
+        self.logger             = logger
+        self.trajectory_dt      = trajectory_dt
+        self.trajectory_cache   = TrajectoryCache( maxsize=trajectory_cache_size )
 
     def __enter__( self ):
         self.init_guidance()
@@ -33,7 +43,7 @@ class GuidanceBase(_RohanBase):
         self.deinit_guidance()        
         if isinstance(self.logger,Logger): 
             self.logger.write(
-                f'Guidance cleaned-up',
+                f'Guidance cleaned-up (trajectory cache {self.trajectory_cache.hits} hits / {self.trajectory_cache.misses} misses)',
                 process_name=self.process_name
             )
 
@@ -49,6 +59,42 @@ class GuidanceBase(_RohanBase):
         Cleans up artifacts openned by guidance initialization
         """
 
+    def plan_trajectory(
+        self,
+        start       : ArrayLike,
+        goal        : ArrayLike,
+        **constraints,
+    ) -> Trajectory:
+        """
+        Precomputes a time-parameterized trajectory from start to goal -- defaults to a minimum-jerk profile and may be overridden
+        :param start: Start setpoint
+        :param goal: Goal setpoint
+        :param constraints: Planning constraints (the default planner accepts duration or max_velocity)
+        :returns Trajectory starting at t=0
+        """
+        return min_jerk_trajectory( start, goal, dt=self.trajectory_dt, **constraints )
+
+    def get_trajectory(
+        self,
+        start       : ArrayLike,
+        goal        : ArrayLike,
+        **constraints,
+    ) -> Trajectory:
+        """
+        Provides the trajectory from start to goal, reusing an earlier solution for identical requests
+        :param start: Start setpoint
+        :param goal: Goal setpoint
+        :param constraints: Planning constraints passed to plan_trajectory()
+        :returns Trajectory whose setpoints are sampled with Trajectory.sample()
+        """
+        return self.trajectory_cache.get_or_plan( start, goal, self.plan_trajectory, **constraints )
+
+    def trajectory_stats( self ) -> Dict[str,float]:
+        """
+        Hit/miss statistics of the trajectory cache
+        """
+        return self.trajectory_cache.stats()
+
 
 SelfThreadedGuidanceBase = TypeVar("SelfThreadedGuidanceBase", bound="ThreadedGuidanceBase" )
 class ThreadedGuidanceBase(GuidanceBase,_RohanThreading):
@@ -61,9 +107,16 @@ class ThreadedGuidanceBase(GuidanceBase,_RohanThreading):
     
     def __init__( 
         self,
-        logger : Optional[Logger] = None  
+        logger                  : Optional[Logger] = None,
+        trajectory_dt           : float = 0.01,
+        trajectory_cache_size   : int   = 32,
     ):
-        GuidanceBase.__init__( self, logger=logger )
+        GuidanceBase.__init__( 
+            self, 
+            logger=logger, 
+            trajectory_dt=trajectory_dt, 
+            trajectory_cache_size=trajectory_cache_size 
+        )
         _RohanThreading.__init__( self )
     
     def __enter__( self ):
@@ -77,8 +130,13 @@ class ThreadedGuidanceBase(GuidanceBase,_RohanThreading):
         return self
     
     def __exit__( self, exception_type, exception_value, traceback ):
-        self.stop_spin()
+        stalled = self.stop_spin()
         if isinstance(self.logger,Logger): 
+            if stalled:
+                self.logger.write(
+                    f'Thread(s) {stalled} did not join within {self.join_timeout} s',
+                    process_name=self.process_name
+                )
             self.logger.write(
                 f'Unravelling guidance thread',
                 process_name=self.process_name
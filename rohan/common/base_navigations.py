@@ -1,7 +1,15 @@
-from rohan.common.base       import _RohanBase, _RohanThreading
-from abc                     import abstractmethod
-from rohan.common.logging    import Logger
-from typing                  import Optional, TypeVar
+from rohan.common.base           import _RohanBase, _RohanThreading
+from abc                         import abstractmethod
+from rohan.common.logging        import Logger
+from rohan.utils.timers          import IntervalTimer
+from typing                      import Optional, TypeVar, NamedTuple, Any, List, Tuple
+from numpy.typing                import NDArray, ArrayLike
+from queue                       import Queue, Full, Empty
+from rohan.utils.clock           import now
+from time                        import sleep
+import heapq
+import itertools
+import numpy as np
 
 
 SelfNavigationBase = TypeVar("SelfNavigationBase", bound="NavigationBase" )
@@ -77,10 +85,246 @@ class ThreadedNavigationBase(NavigationBase,_RohanThreading):
         return self
     
     def __exit__( self, exception_type, exception_value, traceback ):
-        self.stop_spin()
+        stalled = self.stop_spin()
         if isinstance(self.logger,Logger): 
+            if stalled:
+                self.logger.write(
+                    f'Thread(s) {stalled} did not join within {self.join_timeout} s',
+                    process_name=self.process_name
+                )
             self.logger.write(
                 f'Unravelling navigation thread',
                 process_name=self.process_name
             )
         NavigationBase.__exit__( self, exception_type, exception_value, traceback )
+
+
+class Measurement(NamedTuple):
+    """
+    Timestamped measurement submitted to an estimating navigation
+    :param stamp: Time the measurement was taken (rohan.utils.clock now() time base)
+    :param source: Identifier of the measuring device (e.g. camera or joint encoder name)
+    :param value: Measured quantity
+    """
+    stamp   : float
+    source  : Any
+    value   : Any
+
+
+SelfEstimatingNavigationBase = TypeVar("SelfEstimatingNavigationBase", bound="EstimatingNavigationBase" )
+class EstimatingNavigationBase(ThreadedNavigationBase):
+    """
+    Base class for an incremental state estimator running a threaded predict/update loop
+    -- measurements are submitted asynchronously, held for reorder_window seconds so out-of-order arrivals are applied in time order,
+    and fused into preallocated state/covariance arrays in place
+    :param state_dim: Dimension of the estimated state
+    :param logger: rohan Logger() instance
+    :param estimator_intrvl: Inverse-frequency of the predict/update loop
+    :param reorder_window: Time measurements are buffered before being applied (late measurements beyond it are dropped)
+    :param history_size: Number of past estimates kept for state_at() queries
+    :param inbox_size: Maximum number of measurements waiting for the estimator thread
+    """
+
+    process_name        : str = "unnamed estimating navigation"
+    state_dim           : int
+    state               : NDArray
+    covariance          : NDArray
+    state_time          : Optional[float] = None
+    estimator_intrvl    : float
+    reorder_window      : float
+    dropped_late        : int = 0
+    dropped_full        : int = 0
+
+    def __init__(
+        self,
+        state_dim           : int,
+        logger              : Optional[Logger] = None,
+        estimator_intrvl    : float = 1e-3,
+        reorder_window      : float = 0.05,
+        history_size        : int   = 256,
+        inbox_size          : int   = 1024,
+    ):
+        ThreadedNavigationBase.__init__( self, logger=logger )
+        self.state_dim          = state_dim
+        self.estimator_intrvl   = estimator_intrvl
+        self.reorder_window     = reorder_window
+        self.state              = np.zeros( state_dim, dtype=np.float64 )
+        self.covariance         = np.eye( state_dim, dtype=np.float64 )
+        self.state_time         = None
+        self.dropped_late       = 0
+        self.dropped_full       = 0
+
+        self._inbox             : Queue = Queue( maxsize=inbox_size )
+        self._pending           : List[Tuple[float,int,Measurement]] = []
+        self._arrival           = itertools.count()
+
+        # >> NOTE: History is a ring buffer guarded by a sequence counter -- the estimator thread is the only writer,
+        # >> readers copy an entry and retry if the counter moved, so queries never wait on the estimator
+        self._history_times     = np.full( history_size, -np.inf, dtype=np.float64 )
+        self._history_states    = np.zeros( ( history_size, state_dim ), dtype=np.float64 )
+        self._history_covs      = np.zeros( ( history_size, state_dim, state_dim ), dtype=np.float64 )
+        self._history_head      = 0
+        self._history_count     = 0
+        self._history_seq       = 0
+
+        self.add_threaded_method( target=self.estimator_loop, name=f"{self.process_name} estimator loop" )
+
+    @abstractmethod
+    def predict( 
+        self, 
+        state       : NDArray, 
+        covariance  : NDArray, 
+        dt          : float 
+    ) -> None:
+        """
+        Propagates state and covariance forward by dt in place
+        -- also called on copies from state_at(), so it must only modify the arrays it is given
+        :param state: State array of shape (state_dim,)
+        :param covariance: Covariance array of shape (state_dim, state_dim)
+        :param dt: Time to propagate by
+        """
+
+    @abstractmethod
+    def update( 
+        self, 
+        state       : NDArray, 
+        covariance  : NDArray, 
+        measurement : Measurement 
+    ) -> None:
+        """
+        Fuses a measurement into state and covariance in place
+        :param state: State array of shape (state_dim,)
+        :param covariance: Covariance array of shape (state_dim, state_dim)
+        :param measurement: Measurement taken at the current state time
+        """
+
+    def reset_estimate(
+        self,
+        state       : ArrayLike,
+        covariance  : ArrayLike,
+        stamp       : Optional[float] = None,
+    ) -> None:
+        """
+        Sets the prior of the estimator -- to be called before spinning up (e.g. within init_navigation())
+        :param state: Initial state
+        :param covariance: Initial covariance
+        :param stamp: Time of the initial state (defaults to now)
+        """
+        self.state[:]       = state
+        self.covariance[:]  = covariance
+        self.state_time     = now() if stamp is None else stamp
+        self._record_history()
+
+    def submit_measurement(
+        self,
+        value   : Any,
+        source  : Any = None,
+        stamp   : Optional[float] = None,
+    ) -> bool:
+        """
+        Hands a measurement to the estimator thread without blocking -- callable from camera, controller and stack threads
+        :param value: Measured quantity
+        :param source: Identifier of the measuring device
+        :param stamp: Time the measurement was taken (defaults to now)
+        :returns True if the measurement was queued, False if the inbox was full and it was dropped
+        """
+        try:
+            self._inbox.put( Measurement( now() if stamp is None else stamp, source, value ), block=False )
+        except Full:
+            self.dropped_full += 1
+            return False
+        return True
+
+    def state_at( 
+        self, 
+        t : Optional[float] = None 
+    ) -> Tuple[NDArray,NDArray]:
+        """
+        Estimate at time t without blocking on the estimator thread
+        -- the latest estimate at or before t is propagated forward with predict() on a copy
+        :param t: Query time (defaults to now)
+        :returns Copies of the state and covariance at time t
+        :raises RuntimeError: if no estimate has been made yet
+        :raises ValueError: if t precedes the oldest estimate kept in the history (fusing against a later state would be wrong)
+        """
+        t = now() if t is None else t
+        while True:
+            seq = self._history_seq
+            if seq % 2 == 1:
+                # >> NOTE: A write is in progress -- yield the GIL so the writer can finish instead of spinning against it
+                sleep( 0 )
+                continue
+            count, head = self._history_count, self._history_head
+            if count == 0:
+                raise RuntimeError("No estimate is available yet -- call reset_estimate() to provide a prior")
+            size    = self._history_times.shape[0]
+            order   = ( head - count + np.arange(count) ) % size
+            times   = self._history_times[order]
+            found   = int( np.searchsorted( times, t, side="right" ) ) - 1
+            oldest  = float( times[0] )
+            index   = order[ max( found, 0 ) ]
+            stamp   = float( self._history_times[index] )
+            state   = self._history_states[index].copy()
+            cov     = self._history_covs[index].copy()
+            if self._history_seq == seq:
+                break
+            sleep( 0 )
+
+        if found < 0:
+            raise ValueError(f"Query time {t} precedes the oldest estimate in the history ({oldest}) -- increase history_size")
+        if t > stamp:
+            self.predict( state, cov, t - stamp )
+        return state, cov
+
+    def _record_history( self ) -> None:
+        """
+        Appends the current estimate to the history ring buffer
+        """
+        self._history_seq  += 1
+        head                = self._history_head
+        self._history_times[head]       = self.state_time
+        self._history_states[head,:]    = self.state
+        self._history_covs[head,:,:]    = self.covariance
+        self._history_head  = ( head + 1 ) % self._history_times.shape[0]
+        self._history_count = min( self._history_count + 1, self._history_times.shape[0] )
+        self._history_seq  += 1
+
+    def _apply( self, measurement : Measurement ) -> None:
+        """
+        Predicts the estimate up to the measurement time then fuses the measurement
+        """
+        if self.state_time is not None and measurement.stamp < self.state_time:
+            self.dropped_late += 1
+            return
+        if self.state_time is not None and measurement.stamp > self.state_time:
+            self.predict( self.state, self.covariance, measurement.stamp - self.state_time )
+        self.update( self.state, self.covariance, measurement )
+        self.state_time = measurement.stamp
+        self._record_history()
+
+    def estimator_loop( self ) -> None:
+        """
+        Threaded predict/update loop
+        """
+        estimator_timer = IntervalTimer( interval=self.estimator_intrvl )
+        while not self.sigterm.is_set():
+            estimator_timer.await_interval()
+            self.heartbeat()
+            try:
+                while True:
+                    measurement = self._inbox.get( block=False )
+                    heapq.heappush( self._pending, ( measurement.stamp, next(self._arrival), measurement ) )
+            except Empty:
+                pass
+
+            horizon = now() - self.reorder_window
+            while self._pending and self._pending[0][0] <= horizon:
+                self._apply( heapq.heappop( self._pending )[2] )
+
+        while self._pending:
+            self._apply( heapq.heappop( self._pending )[2] )
+        if isinstance(self.logger,Logger) and ( self.dropped_late > 0 or self.dropped_full > 0 ):
+            self.logger.write(
+                f'Estimator dropped {self.dropped_late} late and {self.dropped_full} overflowing measurement(s)',
+                process_name=self.process_name
+            )
@@ -1,7 +1,9 @@
 from abc                     import abstractmethod
 from rohan.common.base       import _RohanBase, _RohanThreading
 from rohan.common.logging    import Logger
-from typing                  import Optional, TypeVar
+from rohan.common.metrics    import REGISTRY
+from rohan.utils.clock       import now, ClockAligner
+from typing                  import Optional, TypeVar, Dict, Any
 
 SelfNetworkBase = TypeVar("SelfNetworkBase", bound="NetworkBase" )
 class NetworkBase(_RohanBase):
@@ -10,14 +12,18 @@ class NetworkBase(_RohanBase):
     :param logger: rohan Logger() instance
     """
 
-    process_name    : str = "unnamed network"
-    logger          : Logger
+    process_name        : str = "unnamed network"
+    logger              : Logger
+    last_transfer_time  : Optional[float] = None
+    clock_aligner       : Optional[ClockAligner] = None
 
     def __init__( 
         self,
         logger : Optional[Logger] = None 
     ):
-        self.logger = logger
+        self.logger             = logger
+        self._bytes_metrics     = {}
+        self._latency_metric    = None
 
     def __enter__( self ):
         self.connect()
@@ -26,6 +32,33 @@ class NetworkBase(_RohanBase):
     def __exit__( self, exception_type, exception_value, traceback ):
         self.disconnect()
 
+    def register_metrics( self, labels : Dict[str,Any] ) -> None:
+        """
+        Registers the network's byte counters and latency histogram under the given labels along with its process_name
+        """
+        self.unregister_metrics()
+        labels = { **labels, "network" : self.process_name }
+        self._bytes_metrics = {
+            direction : REGISTRY.counter( 
+                "rohan_network_bytes_total", 
+                "Bytes transferred by networks", 
+                labels={ **labels, "direction" : direction } 
+            )
+            for direction in ( "tx", "rx" )
+        }
+        self._latency_metric = REGISTRY.histogram( 
+            "rohan_network_latency_seconds", 
+            "Latency of network transfers", 
+            labels=labels 
+        )
+
+    def unregister_metrics( self ) -> None:
+        for metric in ( *self._bytes_metrics.values(), self._latency_metric ):
+            if metric is not None:
+                REGISTRY.unregister( metric )
+        self._bytes_metrics     = {}
+        self._latency_metric    = None
+
     @ abstractmethod
     def connect( self ) -> None :
         """
@@ -38,6 +71,42 @@ class NetworkBase(_RohanBase):
         Disconnects network
         """
 
+    def health_check( self ) -> bool:
+        """
+        Checks a network kept connected across stack instances is still usable before it is adopted (see keep_connections)
+        -- networks should override this with a cheap liveness probe of their link
+        :returns True if the network can be adopted without reconnecting
+        """
+        return True
+
+    def record_transfer(
+        self,
+        nbytes      : int,
+        latency     : Optional[float]   = None,
+        direction   : str               = "tx",
+        device_time : Optional[float]   = None,
+    ) -> float:
+        """
+        Records a transfer in the network's metrics -- to be called by networks after sending or receiving
+        :param nbytes: Number of bytes transferred
+        :param latency: Optional latency of the transfer (e.g. round trip of a command)
+        :param direction: "tx" for sent or "rx" for received data
+        :param device_time: Optional hardware timestamp carried by received data, mapped onto the rohan clock through the network's 
+        clock_aligner (created on first use with a device scale of 1 s)
+        :returns Stamp of the transfer on the rohan clock, also kept as last_transfer_time
+        """
+        stamp = now()
+        if device_time is not None:
+            if self.clock_aligner is None:
+                self.clock_aligner = ClockAligner()
+            stamp = self.clock_aligner.align( device_time, host_time=stamp )
+        self.last_transfer_time = stamp
+        if self._bytes_metrics:
+            self._bytes_metrics[direction].inc( nbytes )
+        if latency is not None and self._latency_metric is not None:
+            self._latency_metric.observe( latency )
+        return stamp
+
 SelfThreadedNetworkBase = TypeVar("SelfThreadedNetworkBase", bound="ThreadedNetworkBase" )
 class ThreadedNetworkBase(NetworkBase,_RohanThreading):
     """
@@ -68,10 +137,21 @@ class ThreadedNetworkBase(NetworkBase,_RohanThreading):
         return self
     
     def __exit__( self, exception_type, exception_value, traceback ):
-        self.stop_spin()
+        stalled = self.stop_spin()
         if isinstance(self.logger,Logger): 
+            if stalled:
+                self.logger.write(
+                    f'Thread(s) {stalled} did not join within {self.join_timeout} s',
+                    process_name=self.process_name
+                )
             self.logger.write(
                 f'Unravelling thread',
                 process_name=self.process_name
             )
         NetworkBase.__exit__( self, exception_type, exception_value, traceback )
+
+    def health_check( self ) -> bool:
+        """
+        Checks the network's threads are still running on top of NetworkBase.health_check()
+        """
+        return NetworkBase.health_check( self ) and all( thread.is_alive() for thread in self.threads )
@@ -1,15 +1,23 @@
 from abc                             import abstractmethod
 from rohan.common.base               import _RohanBase,_RohanThreading
 from rohan.data.classes              import StackConfiguration
-from rohan.common.base_cameras       import CameraBase
-from rohan.common.base_controllers   import ControllerBase
+from rohan.common.base_cameras       import CameraBase, FrameTrigger
+from rohan.common.base_controllers   import ControllerBase, ControllerBatch, batch_controllers
 from rohan.common.base_networks      import NetworkBase
 from rohan.common.base_guidances     import GuidanceBase
 from rohan.common.base_navigations   import NavigationBase
 from rohan.common.logging            import Logger
+from rohan.common.watchdog           import Watchdog, WatchdogAction
+from rohan.common.metrics            import REGISTRY, MetricsServer, Counter, Histogram
+from rohan.common.tracing            import TRACER
+from rohan.common.connections        import CONNECTIONS
 from typing                          import Optional, List, Dict, Union, Any, TypeVar, Type
 from contextlib                      import nullcontext, ExitStack
 from rohan.utils.timers              import IntervalTimer
+from rohan.utils.scheduling          import apply_thread_policy, format_thread_report, capture_thread_scheduling, restore_thread_scheduling
+from rohan.utils.quality             import AdaptiveQuality
+from rohan.utils.buffer_pool         import BufferPool
+from rohan.utils.clock               import now
 
 SelfStackBase = TypeVar("SelfStackBase", bound="StackBase" )
 class StackBase(_RohanBase): 
@@ -17,19 +25,51 @@ class StackBase(_RohanBase):
     Base class for an arbitrary camera(s) + controller(s) + network(s) stack
     :param config: configuration as rohan StackConfiguration() dataclass
     :param spin_intrvl: Inverse-frequency of spinning loop
+    :param spin_trigger: Optional frame arrival the spinning loop waits on before each tick -- "any", "all" or the name(s) of
+    specific cameras (e.g. "camera[left]"), which must call signal_frame() when new data is available
+    :param spin_max_intrvl: Longest time a frame triggered loop waits before ticking anyway (non-positive waits indefinitely)
     """
 
-    process_name : str = "unnamed stack"
-    config       : StackConfiguration
-    spin_intrvl  : float 
+    process_name        : str = "unnamed stack"
+    config              : StackConfiguration
+    spin_intrvl         : float 
+    spin_trigger        : Optional[ Union[ str, List[str] ] ] = None
+    spin_max_intrvl     : float
+    frame_trigger       : Optional[FrameTrigger] = None
+    controller_batches  : List[ControllerBatch]
+    watchdog            : Optional[Watchdog] = None
+    stopping            : bool = False
+    tick_count          : int = 0
+    quality             : Optional[AdaptiveQuality] = None
+    components          : Dict[str,_RohanBase]
+    ticks_metric        : Optional[Counter] = None
+    duration_metric     : Optional[Histogram] = None
+    gated_skips         : int = 0
+    gated_skips_metric  : Optional[Counter] = None
+    buffer_pool         : Optional[BufferPool] = None
 
 
     def __init__( 
         self, 
-        config      : Optional[StackConfiguration] = None,
-        spin_intrvl : float = -1
+        config          : Optional[StackConfiguration]          = None,
+        spin_intrvl     : float                                 = -1,
+        spin_trigger    : Optional[ Union[ str, List[str] ] ]   = None,
+        spin_max_intrvl : float                                 = -1,
     ):
-        self.spin_intrvl = spin_intrvl
+        self.spin_intrvl        = spin_intrvl
+        self.spin_trigger       = spin_trigger
+        self.spin_max_intrvl    = spin_max_intrvl
+        self.frame_trigger      = None
+        self.controller_batches = []
+        self.watchdog           = None
+        self.stopping           = False
+        self.tick_count         = 0
+        self.quality            = None
+        self.components         = {}
+        self._quality_tick      = 0
+        self.gated_skips        = 0
+        self._change_seqs       = {}
+        self._gated_streak      = 0
         self.configure(config=config)
 
     def configure(
@@ -47,19 +87,43 @@ class StackBase(_RohanBase):
         """
         Spin-up stack
         """
-        spin_timer = IntervalTimer(interval=self.spin_intrvl)
-        with Logger(self.config.log_filename) as logger, ExitStack() as stack: 
+        spin_timer      = IntervalTimer(interval=self.spin_intrvl)
+        self.stopping   = False
+        with self._make_logger() as logger, ExitStack() as stack: 
+            if "stack" in self.config.thread_policies:
+                # >> NOTE: spin() runs on the caller's thread, so its scheduling is handed back when the stack spins down
+                stack.callback( restore_thread_scheduling, capture_thread_scheduling() )
+                apply_thread_policy( self.config.thread_policies["stack"] )
+            self.watchdog       = self._make_watchdog( stack=stack, logger=logger )
+            self.frame_trigger  = FrameTrigger( mode=self.spin_trigger ) if self.spin_trigger is not None else None
+            self._start_tracing( stack=stack, logger=logger )
+            self.quality        = self._make_quality()
+            self.components     = {}
+            self._make_metrics( stack=stack )
+            self._make_gating( stack=stack, logger=logger )
+            self._make_buffer_pool( stack=stack, logger=logger )
             _networks, _cameras, _controllers, _guidances, _navigations = self._enter_subcontexts( stack=stack, logger=logger ) 
+            self.controller_batches = batch_controllers( _controllers )
+            if self.frame_trigger is not None:
+                self.frame_trigger.validate()
+            if self.quality is not None:
+                self._apply_quality()
+            if self.watchdog is not None:
+                stack.callback( self.watchdog.disarm )
+                self.watchdog.arm()
 
             if isinstance(logger,Logger): 
                 logger.write(
                     f'Spinning Up Stack',
                     process_name=self.process_name
                 )
+            if self.config.thread_policies:
+                self.log_thread_report( logger )
             try:
-                while True:
-                    spin_timer.await_interval()
-                    self.process( 
+                while not self._should_stop():
+                    if not self._await_tick( spin_timer ):
+                        break
+                    self._step( 
                         network=_networks, 
                         camera=_cameras, 
                         controller=_controllers,
@@ -69,11 +133,377 @@ class StackBase(_RohanBase):
                     )
 
             except KeyboardInterrupt:
+                pass
+
+            if isinstance(logger,Logger): 
+                logger.write(
+                    f'Spinning Down Stack',
+                    process_name=self.process_name
+                )
+
+    def _should_stop( self ) -> bool:
+        """
+        :returns True when the spinning loop should spin down
+        """
+        return self.stopping
+
+    def _await_tick( self, spin_timer : IntervalTimer ) -> bool:
+        """
+        Waits for the next tick -- the spin interval passing and, when frame triggered, the awaited frame(s) arriving
+        :returns True if the tick should be stepped, False if the stack started spinning down while waiting
+        """
+        spin_timer.await_interval()
+        if self.frame_trigger is not None:
+            with TRACER.span( f"{self.process_name}/await frames" ):
+                self.frame_trigger.wait( timeout=self.spin_max_intrvl, abort=self._should_stop )
+        return not self._should_stop()
+
+    def safe_stop( self, reason : str = "" ) -> None:
+        """
+        Brings the stack to a stop after the current tick -- triggered by the watchdog's stop action and may be overridden to 
+        additionally command hardware into a safe state
+        :param reason: Description of why the stop was triggered
+        """
+        self.stopping = True
+        logger = getattr(self,"logger",None) or ( self.watchdog.logger if self.watchdog is not None else None )
+        if isinstance(logger,Logger): 
+            logger.write(
+                f'Safe stop triggered: {reason}',
+                process_name=self.process_name
+            )
+
+    def _make_watchdog(
+        self,
+        stack   : ExitStack,
+        logger  : Logger,
+    ) -> Optional[Watchdog]:
+        """
+        Spins up the watchdog when deadline budgets are configured
+        """
+        if not isinstance(self.config,StackConfiguration) or not self.config.watchdog_budgets:
+            return None
+        watchdog = Watchdog( 
+            logger=logger, 
+            check_intrvl=self.config.watchdog_intrvl, 
+            on_stop=self.safe_stop 
+        )
+        watchdog.thread_policy = self.config.thread_policies.get( "watchdog" )
+        stack.enter_context( watchdog )
+        if "process" in self.config.watchdog_budgets:
+            watchdog.register( 
+                name    = "process",
+                budget  = self.config.watchdog_budgets["process"],
+                action  = self.config.watchdog_actions.get( "process", WatchdogAction.LOG ),
+            )
+        return watchdog
+
+    def _make_quality( self ) -> Optional[AdaptiveQuality]:
+        """
+        Constructs the adaptive quality controller when a quality ladder is configured
+        """
+        if not self.config.quality_ladder:
+            return None
+        budget = self.config.quality_budget if self.config.quality_budget is not None else self.spin_intrvl
+        if budget <= 0:
+            raise ValueError("Adaptive quality requires a positive quality_budget or spin_intrvl")
+        self._quality_tick = 0
+        return AdaptiveQuality( ladder=self.config.quality_ladder, budget=budget )
+
+    def _apply_quality( 
+        self, 
+        logger      : Optional[Logger] = None,
+        previous    : Optional[int]    = None,
+        duration    : Optional[float]  = None,
+    ) -> None:
+        """
+        Applies the current quality level to the stack's cameras and logs the transition
+        """
+        level = self.quality.level
+        for obj in self.components.values():
+            if isinstance(obj,CameraBase):
+                obj.set_quality( decimation=level.camera_decimation, roi=level.camera_roi )
+        if previous is not None and isinstance(logger,Logger): 
+            logger.write(
+                f'Quality stepped {"down" if self.quality.index > previous else "up"} to "{level.name}" '
+                f'(level {self.quality.index} of {len(self.quality.ladder)-1}) after a {1e3*duration:.3f} ms tick '
+                f'with a {1e3*self.quality.budget:.3f} ms budget',
+                process_name=self.process_name
+            )
+
+    def _start_tracing( 
+        self,
+        stack   : ExitStack,
+        logger  : Optional[Logger],
+    ) -> None:
+        """
+        Starts recording spans when a trace file is configured -- the trace is exported once every subcomponent has been unravelled
+        """
+        if self.config.trace_filename is None:
+            return
+        TRACER.start( capacity=self.config.trace_capacity )
+        stack.callback( self._export_trace, logger )
+
+    def _export_trace( self, logger : Optional[Logger] ) -> None:
+        """
+        Stops recording spans and writes them to the configured trace file
+        """
+        TRACER.stop()
+        try:
+            n_events = TRACER.export_chrome( self.config.trace_filename )
+            msg = f'Wrote {n_events} trace events to {self.config.trace_filename} ({TRACER.dropped} dropped)'
+        except Exception as e:
+            msg = f'Failed to write trace to {self.config.trace_filename} with exception {e}'
+        if isinstance(logger,Logger): 
+            logger.write(
+                msg,
+                process_name=self.process_name
+            )
+
+    def _make_metrics( 
+        self,
+        stack : ExitStack,
+    ) -> None:
+        """
+        Registers the stack's loop metrics and spins up the metrics endpoint when an address is configured
+        """
+        labels                  = { "stack" : self.process_name }
+        self.ticks_metric       = REGISTRY.counter( "rohan_stack_ticks_total", "Ticks processed by stacks", labels=labels )
+        self.duration_metric    = REGISTRY.histogram( "rohan_stack_process_seconds", "Duration of process() ticks", labels=labels )
+        if self.config.metrics_address is not None:
+            stack.enter_context( MetricsServer( address=self.config.metrics_address ) )
+
+    def _make_gating( 
+        self,
+        stack   : ExitStack,
+        logger  : Optional[Logger],
+    ) -> None:
+        """
+        Registers the change gating metrics when change detectors are configured -- skips are reported when the stack spins down
+        """
+        self._change_seqs   = {}
+        self._gated_streak  = 0
+        if not self.config.change_gating:
+            return
+        labels                  = { "stack" : self.process_name }
+        self.gated_skips_metric = REGISTRY.counter( "rohan_stack_gated_skips_total", "Ticks skipped as no gated camera changed", labels=labels )
+        REGISTRY.gauge( 
+            "rohan_stack_gated_saved_seconds", 
+            "Estimated process() time saved by change gating (skips times mean tick duration)", 
+            labels=labels 
+        ).set_function( lambda: self.gated_skips_metric.value * self.duration_metric.value["mean"] )
+        stack.callback( self._report_gating, logger )
+
+    def _make_buffer_pool( 
+        self,
+        stack   : ExitStack,
+        logger  : Optional[Logger],
+    ) -> None:
+        """
+        Creates the stack's buffer pool handed to every subcomponent -- its statistics are logged when the stack spins down
+        """
+        self.buffer_pool    = BufferPool( max_bytes=self.config.buffer_pool_bytes )
+        labels              = { "stack" : self.process_name }
+        for state in ( "leased", "idle", "high_water" ):
+            REGISTRY.gauge( 
+                f"rohan_buffer_pool_{state}_bytes", 
+                f"Bytes of {state.replace('_',' ')} buffers in stack buffer pools", 
+                labels=labels 
+            ).set_function( lambda pool=self.buffer_pool, attribute=f"{state}_bytes": getattr( pool, attribute ) )
+        stack.callback( self._report_buffer_pool, logger )
+
+    def _report_buffer_pool( self, logger : Optional[Logger] ) -> None:
+        """
+        Logs the buffer pool's high-water mark and reuse
+        """
+        stats = self.buffer_pool.stats()
+        if isinstance(logger,Logger) and stats["leases"] > 0: 
+            logger.write(
+                f'Buffer pool peaked at {stats["high_water_bytes"]/2**20:.1f} MiB over {stats["leases"]} leases '
+                f'({stats["reuses"]} reused, {stats["allocations"]} allocated, {stats["evictions"]} evicted, {stats["unpooled"]} unpooled)',
+                process_name=self.process_name
+            )
+
+    def _scene_unchanged( self ) -> bool:
+        """
+        Checks whether no gated camera changed since the last processed tick -- a refresh is forced after change_max_skips skipped ticks
+        :returns True if the tick should be skipped
+        """
+        changed = False
+        for name, seen in self._change_seqs.items():
+            change_seq = self.components[name].change_seq
+            if change_seq != seen:
+                self._change_seqs[name] = change_seq
+                changed = True
+        if changed or ( self.config.change_max_skips > 0 and self._gated_streak >= self.config.change_max_skips ):
+            self._gated_streak = 0
+            return False
+        self._gated_streak  += 1
+        self.gated_skips    += 1
+        self.gated_skips_metric.inc()
+        return True
+
+    def _report_gating( self, logger : Optional[Logger] ) -> None:
+        """
+        Logs the skip rate of change gating and the process() time it saved
+        """
+        ticks = self.gated_skips + self.tick_count
+        if isinstance(logger,Logger) and ticks > 0: 
+            logger.write(
+                f'Change gating skipped {self.gated_skips} of {ticks} ticks ({100*self.gated_skips/ticks:.1f}%), '
+                f'saving an estimated {self.gated_skips * self.duration_metric.value["mean"]:.3f} s of process()',
+                process_name=self.process_name
+            )
+
+    def _make_logger( self ) -> Logger:
+        """
+        Constructs the stack's logger with its configured scheduling policy
+        """
+        logger = Logger( 
+            self.config.log_filename,
+            max_bytes       = self.config.log_max_bytes,
+            rotate_intrvl   = self.config.log_rotate_intrvl,
+            backup_count    = self.config.log_backup_count,
+            compression     = self.config.log_compression,
+        )
+        logger.thread_policy = self.config.thread_policies.get( "logger" )
+        return logger
+
+    def log_thread_report( self, logger : Optional[Logger] ) -> None:
+        """
+        Writes where every thread spun off by rohan is scheduled and last ran
+        """
+        if isinstance(logger,Logger): 
+            logger.write(
+                format_thread_report(),
+                process_name=self.process_name
+            )
+
+    def _prepare_subcontext(
+        self,
+        obj     : _RohanBase,
+        name    : str,
+    ) -> None:
+        """
+        Readies a constructed subcomponent before its context is entered
+        :param obj: Subcomponent instance
+        :param name: Name of the subcomponent within the stack (e.g. "camera", "camera[0]" or "camera[left]")
+        """
+        self.components[name] = obj
+        obj.buffer_pool       = self.buffer_pool
+        obj.register_metrics( { "stack" : self.process_name, "component" : name } )
+        if TRACER.enabled and not getattr( obj, "_traced_by_stack", False ):
+            # >> NOTE: Adopted connections were already instrumented by the stack instance which constructed them
+            TRACER.instrument( obj, prefix=f"{self.process_name}/{name}", stop_at=_RohanBase )
+            obj._traced_by_stack = True
+        if isinstance(obj,_RohanThreading) and name in self.config.thread_policies:
+            obj.thread_policy = self.config.thread_policies[name]
+        if self.frame_trigger is not None and isinstance(obj,CameraBase):
+            self.frame_trigger.watch( name, obj )
+        if isinstance(obj,CameraBase):
+            obj.change_detector = self.config.change_gating.get( name )
+            if obj.change_detector is not None:
+                obj.change_detector.reset()
+                # >> NOTE: Seeded one behind the camera so the first tick is always processed
+                self._change_seqs[name] = obj.change_seq - 1
+
+    def _watch_subcontext(
+        self,
+        obj     : _RohanBase,
+        name    : str,
+    ) -> None:
+        """
+        Registers an entered subcomponent with the watchdog when a budget is configured for it -- registration waits until its
+        context was entered so connecting is not counted against the budget
+        :param obj: Subcomponent instance
+        :param name: Name of the subcomponent within the stack
+        """
+        if self.watchdog is not None and name in self.config.watchdog_budgets:
+            self.watchdog.register( 
+                name        = name,
+                budget      = self.config.watchdog_budgets[name],
+                action      = self.config.watchdog_actions.get( name, WatchdogAction.LOG ),
+                component   = obj,
+            )
+
+    def _restart_subcontext(
+        self,
+        obj     : _RohanBase,
+        logger  : Optional[Logger],
+    ) -> None:
+        """
+        Unravels and re-enters the context of a misbehaving subcomponent
+        """
+        if isinstance(logger,Logger): 
+            logger.write(
+                f'Restarting {obj.process_name}',
+                process_name=self.process_name
+            )
+        if isinstance(obj,_RohanThreading):
+            # >> NOTE: start_spin() only recreates threads which ran to completion, so a stalled thread still alive after the
+            # bounded join cannot be recovered by re-entering the context
+            timeout = obj.join_timeout if obj.join_timeout is not None else self.config.watchdog_budgets[obj.watchdog_name]
+            stalled = obj.stop_spin( timeout=timeout )
+            if stalled:
                 if isinstance(logger,Logger): 
                     logger.write(
-                        f'Spinning Down Stack',
+                        f'Restart of {obj.process_name} abandoned as thread(s) {stalled} did not join within {timeout} s ... triggering safe stop',
                         process_name=self.process_name
                     )
+                self.safe_stop( f'thread(s) {stalled} of {obj.process_name} stalled' )
+                return
+        try:
+            obj.__exit__( None, None, None )
+            obj.__enter__()
+        except Exception as e:
+            if isinstance(logger,Logger): 
+                logger.write(
+                    f'Restart of {obj.process_name} raised exception {e} ... triggering safe stop',
+                    process_name=self.process_name
+                )
+            self.safe_stop( f'restart of {obj.process_name} failed' )
+        if self.watchdog is not None:
+            self.watchdog.beat( obj.watchdog_name if isinstance(obj,_RohanThreading) else None )
+
+    def _step( 
+        self, 
+        logger  : Optional[Logger],
+        **contexts
+    ) -> None:
+        """
+        Services pending watchdog requests then runs a single process() tick at the current quality level
+        """
+        if self.watchdog is not None:
+            for obj in self.watchdog.consume_restarts():
+                self._restart_subcontext( obj, logger )
+            if self.watchdog.consume_skip() or self.stopping:
+                return
+        if self.quality is not None:
+            level = self.quality.level
+            self._quality_tick += 1
+            if self._quality_tick % level.process_every != 0:
+                return
+            if level.skip_guidance:
+                contexts["guidance"] = None
+            if level.skip_navigation:
+                contexts["navigation"] = None
+        if self._change_seqs and self._scene_unchanged():
+            return
+        if self.watchdog is not None:
+            self.watchdog.begin_tick( "process" )
+        tick_start = now()
+        with TRACER.span( f"{self.process_name}/process" ):
+            self.process( logger=logger, **contexts )
+        duration = now() - tick_start
+        self.tick_count += 1
+        if self.ticks_metric is not None:
+            self.ticks_metric.inc()
+            self.duration_metric.observe( duration )
+        if self.watchdog is not None:
+            self.watchdog.end_tick( "process" )
+        if self.quality is not None:
+            previous = self.quality.index
+            if self.quality.observe( duration ):
+                self._apply_quality( logger=logger, previous=previous, duration=duration )
 
     def _enter_subcontexts(
         self,
@@ -84,10 +514,55 @@ class StackBase(_RohanBase):
         Enter stack subcomponent contexts
         """
         
+        def _enter_object(
+            obj_class,
+            obj_config,
+            name            : str,
+        ):
+            """
+            Construct, prepare and enter the context of a single subcomponent
+            """
+            if obj_class is None:
+                return stack.enter_context( nullcontext() )
+            keep = self.config.keep_connections and issubclass(obj_class,(CameraBase,NetworkBase))
+            adopted = CONNECTIONS.acquire( obj_class, obj_config, logger=logger ) if keep else None
+            if adopted is not None:
+                obj, context = adopted
+                self._prepare_subcontext( obj, name )
+                self._watch_subcontext( obj, name )
+                if isinstance(logger,Logger): 
+                    logger.write(
+                        f'Adopted live connection of {name}',
+                        process_name=self.process_name
+                    )
+            else:
+                obj = obj_class( logger=logger, **obj_config )
+                self._prepare_subcontext( obj, name )
+                with TRACER.span( f"{self.process_name}/{name}.__enter__" ):
+                    context = obj.__enter__()
+                self._watch_subcontext( obj, name )
+                # >> NOTE: process() receives whatever __enter__ returned -- unlike ExitStack.enter_context(), which passes None
+                # through, components whose __enter__ returns None are handed over themselves
+                if context is None:
+                    context = obj
+
+            def _exit_object( exception_type, exception_value, traceback ):
+                obj.unregister_metrics()
+                if keep:
+                    # >> NOTE: Kept connections stay up for the next stack instance, which health checks them before adoption
+                    CONNECTIONS.release( obj_class, obj_config, obj, context )
+                    return False
+                with TRACER.span( f"{self.process_name}/{name}.__exit__" ):
+                    return obj.__exit__( exception_type, exception_value, traceback )
+
+            stack.push( _exit_object )
+            return context
+
         def _enter_subcontext(
             obj_classes     : Optional[int]     = None,
             obj_configs     : Optional[int]     = None,
-            obj_baseclass   : Type[_RohanBase]  = _RohanBase
+            obj_baseclass   : Type[_RohanBase]  = _RohanBase,
+            obj_kind        : str               = "component",
         ):
             """
             Enter contexts of a specified subcomponent type
@@ -97,18 +572,18 @@ class StackBase(_RohanBase):
                 context = stack.enter_context( nullcontext() ) 
             elif isinstance(obj_classes,List):
                 context = [ 
-                    stack.enter_context( obj_class( logger=logger, **obj_config ) if obj_class is not None else stack.enter_context( nullcontext() ) ) 
-                    for obj_class, obj_config in zip(obj_classes,obj_configs)
+                    _enter_object( obj_class, obj_config, f"{obj_kind}[{index}]" )
+                    for index, ( obj_class, obj_config ) in enumerate( zip(obj_classes,obj_configs) )
                 ]
             elif isinstance(obj_classes,Dict):
                 context = {
-                    key : stack.enter_context( obj_class( logger=logger, **obj_configs[key] ) if obj_class is not None else stack.enter_context( nullcontext() ) ) 
+                    key : _enter_object( obj_class, obj_configs[key], f"{obj_kind}[{key}]" )
                     for key, obj_class in obj_classes.items()
                 }
             else:
                 if not issubclass(obj_classes,obj_baseclass):
                     raise TypeError(f"Object provided is not a subclass of {obj_baseclass}: Provided class is {type(obj_classes)} ")
-                context = stack.enter_context( obj_classes( logger=logger,**obj_configs ) )
+                context = _enter_object( obj_classes, obj_configs, obj_kind )
 
             return context
 
@@ -123,31 +598,44 @@ class StackBase(_RohanBase):
         networks    = _enter_subcontext( 
             obj_classes     = self.config.network_classes,
             obj_configs     = self.config.network_configs,
-            obj_baseclass   = NetworkBase
+            obj_baseclass   = NetworkBase,
+            obj_kind        = "network"
         )
         cameras     = _enter_subcontext( 
             obj_classes     = self.config.camera_classes,
             obj_configs     = self.config.camera_configs,
-            obj_baseclass   = CameraBase
+            obj_baseclass   = CameraBase,
+            obj_kind        = "camera"
         )
         controllers = _enter_subcontext( 
             obj_classes     = self.config.controller_classes,
             obj_configs     = self.config.controller_configs,
-            obj_baseclass   = ControllerBase
+            obj_baseclass   = ControllerBase,
+            obj_kind        = "controller"
         )
         guidances   = _enter_subcontext( 
             obj_classes     = self.config.guidance_classes,
             obj_configs     = self.config.guidance_configs,
-            obj_baseclass   = GuidanceBase
+            obj_baseclass   = GuidanceBase,
+            obj_kind        = "guidance"
         )
         navigations = _enter_subcontext( 
             obj_classes     = self.config.navigation_classes,
             obj_configs     = self.config.navigation_configs,
-            obj_baseclass   = NavigationBase
+            obj_baseclass   = NavigationBase,
+            obj_kind        = "navigation"
         )
 
         return networks, cameras, controllers, guidances, navigations
 
+    def step_controllers( self ) -> None:
+        """
+        Steps every group of batched controllers with a single vectorized call per group
+        -- to be called from process() in place of stepping each BatchedControllerBase individually
+        """
+        for batch in self.controller_batches:
+            batch.step()
+
     @abstractmethod
     def process(  
         self, 
@@ -172,27 +660,42 @@ class ThreadedStackBase(StackBase,_RohanThreading):
     Base class for an arbitrary camera(s) + controller(s) + network(s) stack
     :param config: configuration as rohan StackConfiguration() dataclass
     :param spin_intrvl: Inverse-frequency of spinning loop
+    :param spin_trigger: Optional frame arrival the spinning loop waits on before each tick (see StackBase)
+    :param spin_max_intrvl: Longest time a frame triggered loop waits before ticking anyway (non-positive waits indefinitely)
+    :param logger: Optional shared rohan Logger() instance (if None is provided, the stack spins up its own from config.log_filename)
     """
     
     _instance                       = None
     logger      : Optional[Logger]  = None
+    owns_logger : bool              = False
 
     def __init__( 
         self, 
-        config      : Optional[StackConfiguration] = None,
-        spin_intrvl : float = -1
+        config          : Optional[StackConfiguration]          = None,
+        spin_intrvl     : float                                 = -1,
+        spin_trigger    : Optional[ Union[ str, List[str] ] ]   = None,
+        spin_max_intrvl : float                                 = -1,
+        logger          : Optional[Logger]                      = None,
     ):
         StackBase.__init__( 
             self,
             config=config, 
-            spin_intrvl=spin_intrvl 
+            spin_intrvl=spin_intrvl,
+            spin_trigger=spin_trigger,
+            spin_max_intrvl=spin_max_intrvl,
         )
         _RohanThreading.__init__( self )
-        self.add_threaded_method( target=self.spin )
+        self.add_threaded_method( target=self.spin, name=f"{self.process_name} spin" )
+        self.logger         = logger
+        self.owns_logger    = False
 
 
     def __enter__( self ):
-        self.logger = Logger(self.config.log_filename).__enter__()
+        if self.logger is None or self.owns_logger:
+            self.logger         = self._make_logger().__enter__()
+            self.owns_logger    = True
+        self.thread_policy  = self.config.thread_policies.get( "stack" )
+        self.stopping       = False
         self.start_spin()
         if isinstance(self.logger,Logger): 
             self.logger.write(
@@ -203,13 +706,19 @@ class ThreadedStackBase(StackBase,_RohanThreading):
     
 
     def __exit__( self, exception_type, exception_value, traceback ):
-        self.stop_spin()
+        stalled = self.stop_spin()
         if isinstance(self.logger,Logger): 
+            if stalled:
+                self.logger.write(
+                    f'Stack thread(s) {stalled} did not join within {self.join_timeout} s',
+                    process_name=self.process_name
+                )
             self.logger.write(
                 f'Unravelling stack threads',
                 process_name=self.process_name
             )
-        self.logger.__exit__(exception_type, exception_value, traceback)
+        if self.owns_logger:
+            self.logger.__exit__(exception_type, exception_value, traceback)
 
 
     def configure(
@@ -229,19 +738,39 @@ class ThreadedStackBase(StackBase,_RohanThreading):
         """
         Spin-up stack
         """
-        spin_timer = IntervalTimer(interval=self.spin_intrvl)
+        spin_timer      = IntervalTimer(interval=self.spin_intrvl)
+        self.stopping   = False
         with ExitStack() as stack: 
+            self.watchdog       = self._make_watchdog( stack=stack, logger=self.logger )
+            self.frame_trigger  = FrameTrigger( mode=self.spin_trigger ) if self.spin_trigger is not None else None
+            self._start_tracing( stack=stack, logger=self.logger )
+            self.quality        = self._make_quality()
+            self.components     = {}
+            self._make_metrics( stack=stack )
+            self._make_gating( stack=stack, logger=self.logger )
+            self._make_buffer_pool( stack=stack, logger=self.logger )
             _networks, _cameras, _controllers, _guidances, _navigations = self._enter_subcontexts( stack=stack, logger=self.logger ) 
+            self.controller_batches = batch_controllers( _controllers )
+            if self.frame_trigger is not None:
+                self.frame_trigger.validate()
+            if self.quality is not None:
+                self._apply_quality()
+            if self.watchdog is not None:
+                stack.callback( self.watchdog.disarm )
+                self.watchdog.arm()
 
             if isinstance(self.logger,Logger): 
                 self.logger.write(
                     f'Spinning up stack',
                     process_name=self.process_name
                 )
+            if self.config.thread_policies:
+                self.log_thread_report( self.logger )
             
-            while not self.sigterm.is_set():
-                spin_timer.await_interval()
-                self.process( 
+            while not self._should_stop():
+                if not self._await_tick( spin_timer ):
+                    break
+                self._step( 
                     network=_networks, 
                     camera=_cameras, 
                     controller=_controllers,
@@ -256,6 +785,12 @@ class ThreadedStackBase(StackBase,_RohanThreading):
                         process_name=self.process_name
                     )
 
+    def _should_stop( self ) -> bool:
+        """
+        :returns True when the spinning loop should spin down
+        """
+        return self.stopping or self.sigterm.is_set()
+
     @classmethod
     def get_instance(cls):
         """
@@ -269,7 +804,8 @@ class ThreadedStackBase(StackBase,_RohanThreading):
     @classmethod
     def reset_instance(cls):
         """
-        Create a new singleton instance
+        Create a new singleton instance -- with config.keep_connections, the new instance adopts the previous instance's cameras and
+        networks once entered (see rohan.common.connections)
         """
         stop_instance_threads = False
         with cls._instance_lock:
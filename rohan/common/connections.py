@@ -0,0 +1,137 @@
+import atexit
+import threading
+from rohan.common.base           import _RohanBase, _RohanThreading
+from rohan.common.base_cameras   import CameraBase
+from rohan.common.logging        import Logger
+from rohan.utils.keys            import freeze
+from typing                      import Optional, Dict, List, Tuple, Any, Hashable
+
+"""
+Pool of live hardware connections (cameras and networks) kept connected across stack instances
+-- a stack configured with keep_connections releases its cameras and networks here instead of disconnecting them, and the next
+stack built from the same class and configuration adopts them after a health check rather than reconnecting from scratch
+"""
+
+
+class ConnectionPool:
+
+    """
+    Registry of idle, still-connected subcomponents keyed by class and configuration
+    """
+
+    def __init__( self ):
+        self._idle          : Dict[ Tuple[type,Hashable], List[ Tuple[_RohanBase,Any] ] ] = {}
+        self._lock          = threading.Lock()
+        self._registered    = False
+
+    @staticmethod
+    def key(
+        obj_class   : type,
+        obj_config  : Dict[str,Any]
+    ) -> Tuple[type,Hashable]:
+        return ( obj_class, freeze( obj_config ) )
+
+    def __len__( self ) -> int:
+        with self._lock:
+            return sum( len(idle) for idle in self._idle.values() )
+
+    def release(
+        self,
+        obj_class   : type,
+        obj_config  : Dict[str,Any],
+        obj         : _RohanBase,
+        context     : Optional[Any] = None,
+    ) -> None:
+        """
+        Parks a connected subcomponent for adoption by a later stack -- its stack-specific attachments are detached
+        :param obj_class: Class the subcomponent was constructed from
+        :param obj_config: Configuration the subcomponent was constructed with
+        :param obj: Connected subcomponent
+        :param context: Value returned by the subcomponent's __enter__ (defaults to the subcomponent itself)
+        """
+        obj.logger      = None
+        obj.buffer_pool = None
+        obj.unregister_metrics()
+        if isinstance(obj,_RohanThreading):
+            obj.watchdog        = None
+            obj.watchdog_name   = None
+        if isinstance(obj,CameraBase):
+            obj.frame_condition = None
+            obj.change_detector = None
+            obj.set_quality()
+            # >> NOTE: The stack's leases go back to its pool now -- a camera without a capture thread is idle once its stack stopped,
+            # while a capture thread moves its pipeline off the stack's pool by itself on the next frame (see CameraBase.preprocess())
+            if not isinstance(obj,_RohanThreading):
+                obj.release_buffers()
+        with self._lock:
+            self._idle.setdefault( self.key( obj_class, obj_config ), [] ).append( ( obj, obj if context is None else context ) )
+            if not self._registered:
+                # >> NOTE: Parked threaded components keep non-daemon spin threads alive, which the interpreter joins before running
+                # atexit hooks -- the pool is closed ahead of that join through threading._register_atexit, a CPython internal
+                # (3.9+) this relies on as a last resort only. Where it is missing, atexit is used and close_all() must be called
+                # explicitly (as StackSupervisor does on exit) for the process to exit
+                register = getattr( threading, "_register_atexit", atexit.register )
+                register( self.close_all )
+                self._registered = True
+
+    def acquire(
+        self,
+        obj_class   : type,
+        obj_config  : Dict[str,Any],
+        logger      : Optional[Logger] = None,
+    ) -> Optional[ Tuple[_RohanBase,Any] ]:
+        """
+        Adopts a parked subcomponent of the same class and configuration if it passes its health check
+        -- subcomponents failing the check are disconnected and discarded
+        :param obj_class: Class of the requested subcomponent
+        :param obj_config: Configuration of the requested subcomponent
+        :param logger: rohan Logger() instance handed to the adopted subcomponent
+        :returns The adopted subcomponent and the value its __enter__ returned, or None if it must be constructed and connected anew
+        """
+        with self._lock:
+            idle    = self._idle.get( self.key( obj_class, obj_config ) )
+            parked  = idle.pop() if idle else None
+        if parked is None:
+            return None
+        obj, _ = parked
+        obj.logger = logger
+        try:
+            healthy = obj.health_check()
+        except Exception as e:
+            healthy = False
+            if isinstance(logger,Logger):
+                logger.write(
+                    f'Health check raised exception {e}',
+                    process_name=obj.process_name
+                )
+        if healthy:
+            return parked
+        if isinstance(logger,Logger):
+            logger.write(
+                f'Parked connection failed its health check ... reconnecting',
+                process_name=obj.process_name
+            )
+        self._close( obj )
+        return None
+
+    def close_all( self ) -> int:
+        """
+        Disconnects every parked subcomponent
+        :returns Number of subcomponents disconnected
+        """
+        with self._lock:
+            parked      = [ obj for idle in self._idle.values() for obj, _ in idle ]
+            self._idle  = {}
+        for obj in parked:
+            self._close( obj )
+        return len(parked)
+
+    @staticmethod
+    def _close( obj : _RohanBase ) -> None:
+        try:
+            obj.__exit__( None, None, None )
+        except Exception:
+            pass
+
+
+CONNECTIONS = ConnectionPool()
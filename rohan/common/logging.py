@@ -1,9 +1,150 @@
+import bz2
+import gzip
+import json
+import lzma
+import os
+import shutil
 from rohan.common.base   import _RohanThreading
+from rohan.common.metrics import REGISTRY, Counter, Gauge
+from rohan.common.tracing import TRACER
 from rohan.utils.timers  import IntervalTimer
-from time                import time 
-from typing              import Optional
+from datetime            import datetime
+from rohan.utils.clock   import now, since_epoch, to_wall
+from typing              import Optional, Dict, Tuple, Callable, Any
 from io                  import TextIOWrapper
-from queue               import Queue, Full
+from queue               import Queue, Full, Empty
+
+def _compressors() -> Dict[ str, Tuple[ Callable[...,Any], str ] ]:
+    """
+    Compressors available from the standard library, keyed by name, as (open function, file suffix)
+    """
+    compressors = {
+        "gzip"  : ( gzip.open, ".gz" ),
+        "bz2"   : ( bz2.open, ".bz2" ),
+        "lzma"  : ( lzma.open, ".xz" ),
+    }
+    try:
+        from compression import zstd
+        compressors["zstd"] = ( zstd.open, ".zst" )
+    except ImportError:
+        pass
+    return compressors
+
+class LogArchive:
+
+    """
+    Archive of rotated log segments -- compresses segments, keeps an index mapping segments to time ranges and enforces retention
+    -- only ever used from the logger's archival thread
+    :param filename: File name of the live log (segments and the index are written next to it)
+    :param compression: Name of the compressor ("gzip", "bz2", "lzma", "zstd" where available, or None to keep segments uncompressed)
+    :param backup_count: Number of segments retained (non-positive keeps every segment)
+    """
+
+    filename        : str
+    index_filename  : str
+    compression     : Optional[str]
+    backup_count    : int
+
+    def __init__(
+        self,
+        filename        : str,
+        compression     : Optional[str] = "gzip",
+        backup_count    : int           = -1,
+    ):
+        compressors = _compressors()
+        if compression is not None and compression not in compressors:
+            raise ValueError(f"Unknown log compression {compression}: Available are {sorted(compressors)}")
+        self.filename       = filename
+        self.index_filename = f"{filename}.index"
+        self.compression    = compression
+        self.backup_count   = backup_count
+        self._open, self._suffix = compressors[compression] if compression is not None else ( None, "" )
+
+    def segment_name( self, start : float ) -> str:
+        """
+        Name of the uncompressed segment of a live log started at start
+        """
+        stamp   = datetime.fromtimestamp( start ).strftime( "%Y%m%d-%H%M%S" )
+        name    = f"{self.filename}.{stamp}"
+        counter = 0
+        while any( os.path.exists( candidate ) for candidate in ( name, name + self._suffix ) ):
+            counter += 1
+            name     = f"{self.filename}.{stamp}.{counter}"
+        return name
+
+    def archive(
+        self,
+        segment : str,
+        start   : float,
+        end     : float,
+    ) -> str:
+        """
+        Compresses a rotated segment, records it in the index and removes segments beyond retention
+        :param segment: Path of the uncompressed segment
+        :param start: Wall time of the segment's first record
+        :param end: Wall time of the segment's last record
+        :returns Path of the archived segment
+        """
+        archived = segment
+        if self._open is not None:
+            archived = segment + self._suffix
+            with open( segment, "rb" ) as source, self._open( archived, "wb" ) as target:
+                shutil.copyfileobj( source, target )
+            os.remove( segment )
+
+        with open( self.index_filename, "a" ) as index:
+            index.write( json.dumps( {
+                "segment"   : os.path.basename( archived ),
+                "start"     : start,
+                "end"       : end,
+                "start_iso" : datetime.fromtimestamp( start ).isoformat( timespec="seconds" ),
+                "end_iso"   : datetime.fromtimestamp( end ).isoformat( timespec="seconds" ),
+            } ) + "\n" )
+
+        if self.backup_count > 0:
+            self._enforce_retention()
+        return archived
+
+    def entries( self ) -> list:
+        """
+        Index entries ordered from oldest to newest
+        """
+        if not os.path.exists( self.index_filename ):
+            return []
+        with open( self.index_filename ) as index:
+            return [ json.loads(line) for line in index if line.strip() ]
+
+    def find( 
+        self, 
+        start   : float, 
+        end     : float 
+    ) -> list:
+        """
+        Paths of the segments holding records between the wall times start and end
+        """
+        directory = os.path.dirname( self.filename )
+        return [ 
+            os.path.join( directory, entry["segment"] ) 
+            for entry in self.entries() 
+            if entry["end"] >= start and entry["start"] <= end 
+        ]
+
+    def _enforce_retention( self ) -> None:
+        entries = self.entries()
+        if len(entries) <= self.backup_count:
+            return
+        directory = os.path.dirname( self.filename )
+        expired, kept = entries[:-self.backup_count], entries[-self.backup_count:]
+        for entry in expired:
+            try:
+                os.remove( os.path.join( directory, entry["segment"] ) )
+            except FileNotFoundError:
+                pass
+        # >> NOTE: The index is rewritten to a temporary file first so an interrupted rewrite never loses it
+        with open( self.index_filename + ".tmp", "w" ) as index:
+            index.writelines( json.dumps(entry) + "\n" for entry in kept )
+        os.replace( self.index_filename + ".tmp", self.index_filename )
+
 
 class Logger(_RohanThreading):
 
@@ -11,6 +152,11 @@ class Logger(_RohanThreading):
     Logger for rohan Modules
     :param filename: Optional file name for logger to write to (if None is provided, no file will be openneds)
     :param queue_size: Size of logger queue (defaults to inf)
+    :param thread_intrvl: Minimum interval between written messages
+    :param max_bytes: Size (in characters) after which the log file is rotated (non-positive disables size-based rotation)
+    :param rotate_intrvl: Time (in seconds) after which the log file is rotated (non-positive disables time-based rotation)
+    :param backup_count: Number of rotated segments retained (non-positive keeps every segment)
+    :param compression: Compressor of rotated segments ("gzip", "bz2", "lzma", "zstd" where available, or None)
     """
     process_name     : str = "logger"
     init_time        : float 
@@ -18,28 +164,62 @@ class Logger(_RohanThreading):
     file             : Optional[TextIOWrapper]  = None
     log_queue        : Queue
     thread_intrvl    : float
+    archive          : Optional[LogArchive]     = None
+    drops_metric     : Counter
+    depth_metric     : Gauge
 
     def __init__(
         self,
-        filename        : Optional[str] = None,
-        queue_size      : int           = -1,
-        thread_intrvl   : float         = -1,
+        filename        : Optional[str]     = None,
+        queue_size      : int               = -1,
+        thread_intrvl   : float             = -1,
+        max_bytes       : int               = -1,
+        rotate_intrvl   : float             = -1,
+        backup_count    : int               = -1,
+        compression     : Optional[str]     = "gzip",
     ):
         _RohanThreading.__init__( self )
-        self.init_time      = time()
+        self.init_time      = now()
         self.filename       = filename
+        self.log_queue      = Queue(maxsize=queue_size)
+        labels              = { "logger" : self.filename if self.filename is not None else "console" }
+        self.drops_metric   = REGISTRY.counter( "rohan_logger_dropped_total", "Messages dropped by full logger queues", labels=labels )
+        self.depth_metric   = REGISTRY.gauge( "rohan_logger_queue_depth", "Messages waiting in logger queues", labels=labels )
+        self.depth_metric.set_function( self.log_queue.qsize )
+        self.max_bytes      = max_bytes
+        self.rotate_intrvl  = rotate_intrvl
+        self.archive        = None
+        self._archive_queue = Queue()
+        self._segment_start = to_wall( now() )
+        self._segment_end   = self._segment_start
+        self._segment_bytes = 0
+        mode = "w"
+        if self.filename is not None and ( max_bytes > 0 or rotate_intrvl > 0 ):
+            self.archive = LogArchive( filename=self.filename, compression=compression, backup_count=backup_count )
+            self.add_threaded_method( target=self.archive_spin, name=f"{self.process_name} archive" )
+            try:
+                if os.path.exists(self.filename) and os.path.getsize(self.filename) > 0:
+                    # >> NOTE: Rotating logs are never truncated -- the previous run's log becomes a segment of its own
+                    modified = os.path.getmtime(self.filename)
+                    self._rotate_file( start=modified, end=modified )
+            except OSError as e:
+                # >> NOTE: A log which cannot be moved aside is appended to rather than truncated, so the logger still spins up
+                mode = "a"
+                self.write(
+                    f'Failed to rotate the previous {self.filename} with exception {e} ... appending to it',
+                    process_name=self.process_name
+                )
         if self.filename is not None:
             try:
-                self.file = open(self.filename,"w")
+                self.file = open(self.filename,mode)
             except Exception as e:
                 self.file = None
                 self.write(
                     f'Failed to open {self.filename} with exception {e}',
                     process_name=self.process_name
                 )
-        self.log_queue      = Queue(maxsize=queue_size)
         self.thread_intrvl  = thread_intrvl
-        self.add_threaded_method( target=self.spin )
+        self.add_threaded_method( target=self.spin, name=f"{self.process_name} spin" )
         
     def __enter__( self ):
         self.start_spin()
@@ -59,31 +239,53 @@ class Logger(_RohanThreading):
         if isinstance(self.file,TextIOWrapper):
             self.file.close()
         self.file = None
+        # >> NOTE: The gauge reads this logger's queue, so it is dropped with the logger unless a later logger of the same file took it over
+        if self.depth_metric.function == self.log_queue.qsize:
+            self.depth_metric.set_function( None )
+            REGISTRY.unregister( self.depth_metric )
+        # >> NOTE: Segments rotated after the archival thread spun down are archived before returning
+        while self.archive is not None and not self._archive_queue.empty():
+            segment, start, end = self._archive_queue.get()
+            try:
+                self.archive.archive( segment, start, end )
+            except Exception as e:
+                print( self._format_msg( msg=f'Archiving {segment} raised exception {e}', process_name=self.process_name ) )
 
 
     def _format_msg( 
         self, 
         msg          : str,
         process_name : str = " ",
+        stamp        : Optional[float] = None,
     ): 
         """
         Formater for incoming message 
         :param msg: Message for logger to write 
         :param process_name: Name of process writing message
+        :param stamp: Time the message was written on the shared rohan clock (defaults to now)
         """
-        return "[@{:.2f}] {} -> {} ".format( time() - self.init_time, process_name, msg )
+        # >> NOTE: Records are stamped on the shared rohan clock so they line up with frame, command and trace stamps
+        return "[@{:.4f}] {} -> {} ".format( since_epoch( stamp ), process_name, msg )
 
 
     def spin( self ):
         thread_timer = IntervalTimer(interval=self.thread_intrvl)
-        while not self.sigterm.is_set():
-            while not self.log_queue.empty(): 
-                thread_timer.await_interval()
-                formatted_msg = self.log_queue.get()
+        # >> NOTE: Waits on the queue rather than polling it, and drains it before spinning down so no message is lost
+        while not self.sigterm.is_set() or not self.log_queue.empty():
+            try:
+                formatted_msg = self.log_queue.get( timeout=0.05 )
+            except Empty:
+                if self._segment_bytes > 0 and self._rotation_due():
+                    self._rotate()
+                continue
+            thread_timer.await_interval()
+            with TRACER.span( "log write" ):
                 print( formatted_msg )
                 if isinstance(self.file,TextIOWrapper):
                     try:
                         self.file.write( formatted_msg + "\n")
+                        self._segment_bytes += len(formatted_msg) + 1
+                        self._segment_end    = to_wall( now() )
                     except Exception as e:
                         print(  
                             self._format_msg( 
@@ -91,21 +293,89 @@ class Logger(_RohanThreading):
                                 process_name=self.process_name 
                             ) 
                         ) 
+            if self._rotation_due():
+                self._rotate()
+
+    def _rotation_due( self ) -> bool:
+        if self.archive is None or not isinstance(self.file,TextIOWrapper):
+            return False
+        return ( 
+            ( self.max_bytes > 0 and self._segment_bytes >= self.max_bytes ) or 
+            ( self.rotate_intrvl > 0 and to_wall( now() ) - self._segment_start >= self.rotate_intrvl )
+        )
+
+    def _rotate_file( 
+        self, 
+        start   : float, 
+        end     : float 
+    ) -> None:
+        """
+        Moves the live log file aside as a segment and hands it to the archival thread
+        """
+        segment = self.archive.segment_name( start )
+        os.replace( self.filename, segment )
+        self._archive_queue.put( ( segment, start, end ) )
+
+    def _rotate( self ) -> None:
+        """
+        Closes the live log, queues it for archival and opens a fresh one -- compression is left to the archival thread so writing never stalls
+        """
+        with TRACER.span( "log rotate" ):
+            try:
+                self.file.close()
+                self._rotate_file( start=self._segment_start, end=self._segment_end )
+                self.file = open(self.filename,"w")
+            except Exception as e:
+                print(  
+                    self._format_msg( 
+                        msg=f"Attempt to rotate {self.filename} raised exception {e}", 
+                        process_name=self.process_name 
+                    ) 
+                ) 
+                try:
+                    if self.file.closed:
+                        self.file = open(self.filename,"a")
+                except Exception:
+                    self.file = None
+        self._segment_start = self._segment_end = to_wall( now() )
+        self._segment_bytes = 0
+
+    def archive_spin( self ):
+        """
+        Compresses, indexes and prunes rotated segments in the background
+        """
+        while not self.sigterm.is_set() or not self._archive_queue.empty():
+            try:
+                segment, start, end = self._archive_queue.get( timeout=0.1 )
+            except Empty:
+                continue
+            try:
+                with TRACER.span( "log archive" ):
+                    self.archive.archive( segment, start, end )
+            except Exception as e:
+                self.write(
+                    f'Archiving {segment} raised exception {e}',
+                    process_name=self.process_name
+                )
 
 
     def write(
         self,
         msg          : str,
         process_name : str = " ",
+        stamp        : Optional[float] = None,
     ):
         """
         Write log information either to file or to console
         :param msg: Message for logger to write 
         :param process_name: Name of process writing message
+        :param stamp: Time the message was written on the shared rohan clock (defaults to now) -- e.g. for messages relayed from
+        another process of the host
         """
+        TRACER.instant( "log enqueue" )
         try:
-            self.log_queue.put( self._format_msg( msg=msg, process_name=process_name ), block=False  )
+            self.log_queue.put( self._format_msg( msg=msg, process_name=process_name, stamp=stamp ), block=False  )
         except Full:
             # >> ISSUE: Possible consequence of finite sized queue, especially relatively small queues wrt traffic
-            # >> TODO: Inform user that log queue was full and that message was therefore dropped
-            pass
\ No newline at end of file
+            # >> NOTE: Dropped messages are counted in the rohan_logger_dropped_total metric
+            self.drops_metric.inc()
\ No newline at end of file
@@ -0,0 +1,334 @@
+import os
+import socketserver
+import threading
+from bisect             import bisect_left
+from http.server        import BaseHTTPRequestHandler, ThreadingHTTPServer
+from rohan.common.base  import _RohanThreading
+from typing             import Optional, Dict, List, Tuple, Union, Callable, Sequence, Any
+
+"""
+Low-overhead metrics shared by rohan modules and exposed in the Prometheus text format
+-- counters and histograms write to per-thread cells so recording never takes a lock; cells are only summed when collected
+"""
+
+Labels = Tuple[ Tuple[str,str], ... ]
+
+
+def _freeze_labels( labels : Optional[Dict[str,Any]] ) -> Labels:
+    return tuple( sorted( ( str(key), str(value) ) for key, value in ( labels or {} ).items() ) )
+
+
+def _format_labels( labels : Labels, extra : Labels = () ) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = ( ( key, value.replace("\\","\\\\").replace('"','\\"').replace("\n","\\n") ) for key, value in pairs )
+    return "{" + ",".join( f'{key}="{value}"' for key, value in escaped ) + "}"
+
+
+class _Metric:
+    """
+    Common bookkeeping of metrics
+    """
+
+    kind : str = "untyped"
+
+    def __init__(
+        self,
+        name    : str,
+        help    : str,
+        labels  : Labels,
+    ):
+        self.name   = name
+        self.help   = help
+        self.labels = labels
+        self._cells : Dict[int,list] = {}
+        self._lock  = threading.Lock()
+
+    def _cell( self, size : int ) -> list:
+        """
+        Cell owned by the calling thread -- created under the lock once per thread, then written without it
+        """
+        ident   = threading.get_ident()
+        cell    = self._cells.get(ident)
+        if cell is None:
+            with self._lock:
+                cell = self._cells.setdefault( ident, [0] * size )
+        return cell
+
+    def _cells_snapshot( self ) -> List[list]:
+        with self._lock:
+            return list( self._cells.values() )
+
+
+class Counter(_Metric):
+
+    """
+    Monotonically increasing count
+    """
+
+    kind : str = "counter"
+
+    def inc( self, amount : float = 1 ) -> None:
+        self._cell(1)[0] += amount
+
+    @property
+    def value( self ) -> float:
+        return sum( cell[0] for cell in self._cells_snapshot() )
+
+    def samples( self ) -> List[Tuple[str,Labels,float]]:
+        return [ ( self.name, (), self.value ) ]
+
+
+class Gauge(_Metric):
+
+    """
+    Value which may go up and down -- either set directly or read from a function when collected
+    """
+
+    kind : str = "gauge"
+
+    def __init__(
+        self,
+        name    : str,
+        help    : str,
+        labels  : Labels,
+    ):
+        _Metric.__init__( self, name, help, labels )
+        self._value     : float = 0.0
+        self._function  : Optional[Callable[[],float]] = None
+
+    def set( self, value : float ) -> None:
+        self._value = value
+
+    def inc( self, amount : float = 1 ) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec( self, amount : float = 1 ) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set_function( self, function : Optional[Callable[[],float]] ) -> None:
+        """
+        Reads the gauge from a function when collected, so nothing is recorded on the hot path
+        """
+        self._function = function
+
+    @property
+    def function( self ) -> Optional[Callable[[],float]]:
+        return self._function
+
+    @property
+    def value( self ) -> float:
+        if self._function is not None:
+            try:
+                return float( self._function() )
+            except Exception:
+                return float("nan")
+        return self._value
+
+    def samples( self ) -> List[Tuple[str,Labels,float]]:
+        return [ ( self.name, (), self.value ) ]
+
+
+class Histogram(_Metric):
+
+    """
+    Distribution of observations over fixed buckets
+    :param buckets: Increasing upper bounds of the buckets (an implicit +Inf bucket is appended)
+    """
+
+    kind : str = "histogram"
+    DEFAULT_BUCKETS : Tuple[float,...] = ( 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 1e-1, 2.5e-1, 5e-1, 1.0 )
+
+    def __init__(
+        self,
+        name    : str,
+        help    : str,
+        labels  : Labels,
+        buckets : Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        _Metric.__init__( self, name, help, labels )
+        self.buckets = tuple( sorted(buckets) )
+
+    def observe( self, value : float ) -> None:
+        # >> NOTE: Cells hold per-bucket counts followed by the sum and count of observations
+        n_buckets   = len(self.buckets)
+        cell        = self._cell( n_buckets + 3 )
+        cell[ bisect_left( self.buckets, value ) ] += 1
+        cell[ n_buckets + 1 ] += value
+        cell[ n_buckets + 2 ] += 1
+
+    def totals( self ) -> Tuple[List[float],float,float]:
+        """
+        :returns Non-cumulative bucket counts (including +Inf), sum and count of observations
+        """
+        n_buckets   = len(self.buckets)
+        counts      = [0] * ( n_buckets + 1 )
+        total, count = 0.0, 0
+        for cell in self._cells_snapshot():
+            for index in range( n_buckets + 1 ):
+                counts[index] += cell[index]
+            total += cell[ n_buckets + 1 ]
+            count += cell[ n_buckets + 2 ]
+        return counts, total, count
+
+    @property
+    def value( self ) -> Dict[str,float]:
+        _, total, count = self.totals()
+        return { "count" : count, "sum" : total, "mean" : total / count if count > 0 else 0.0 }
+
+    def samples( self ) -> List[Tuple[str,Labels,float]]:
+        counts, total, count = self.totals()
+        samples     = []
+        cumulative  = 0
+        for bound, bucket_count in zip( self.buckets + ( float("inf"), ), counts ):
+            cumulative += bucket_count
+            samples.append( ( f"{self.name}_bucket", ( ( "le", "+Inf" if bound == float("inf") else repr(bound) ), ), cumulative ) )
+        samples.append( ( f"{self.name}_sum", (), total ) )
+        samples.append( ( f"{self.name}_count", (), count ) )
+        return samples
+
+
+class MetricsRegistry:
+
+    """
+    Registry of named metrics -- registering an existing name and labels returns the existing metric
+    """
+
+    def __init__( self ):
+        self._metrics   : Dict[Tuple[str,Labels],_Metric] = {}
+        self._lock      = threading.Lock()
+
+    def _get_or_create(
+        self,
+        metric_class    : type,
+        name            : str,
+        help            : str,
+        labels          : Optional[Dict[str,Any]],
+        **kwargs
+    ) -> Any:
+        key = ( name, _freeze_labels(labels) )
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = self._metrics[key] = metric_class( name, help, key[1], **kwargs )
+            elif not isinstance(metric,metric_class):
+                raise TypeError(f"Metric {name} is already registered as a {metric.kind}")
+        return metric
+
+    def counter( self, name : str, help : str = "", labels : Optional[Dict[str,Any]] = None ) -> Counter:
+        return self._get_or_create( Counter, name, help, labels )
+
+    def gauge( self, name : str, help : str = "", labels : Optional[Dict[str,Any]] = None ) -> Gauge:
+        return self._get_or_create( Gauge, name, help, labels )
+
+    def histogram(
+        self,
+        name    : str,
+        help    : str = "",
+        labels  : Optional[Dict[str,Any]] = None,
+        buckets : Sequence[float] = Histogram.DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create( Histogram, name, help, labels, buckets=buckets )
+
+    def unregister( self, metric : _Metric ) -> None:
+        """
+        Removes a metric from the registry -- a metric registered since under the same name and labels is left in place
+        """
+        with self._lock:
+            key = ( metric.name, metric.labels )
+            if self._metrics.get(key) is metric:
+                del self._metrics[key]
+
+    def snapshot( self ) -> Dict[str,Any]:
+        """
+        In-process view of every metric
+        :returns Dictionary keyed by metric name and labels (Prometheus notation) holding values (dictionaries for histograms)
+        """
+        with self._lock:
+            metrics = list( self._metrics.values() )
+        return { f"{metric.name}{_format_labels(metric.labels)}" : metric.value for metric in metrics }
+
+    def render_prometheus( self ) -> str:
+        """
+        Every metric in the Prometheus text exposition format
+        """
+        with self._lock:
+            metrics = sorted( self._metrics.values(), key=lambda metric: ( metric.name, metric.labels ) )
+        lines   = []
+        headed  = set()
+        for metric in metrics:
+            if metric.name not in headed:
+                headed.add( metric.name )
+                lines.append( f"# HELP {metric.name} {metric.help}" )
+                lines.append( f"# TYPE {metric.name} {metric.kind}" )
+            for name, extra, value in metric.samples():
+                lines.append( f"{name}{_format_labels(metric.labels,extra)} {value}" )
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """
+    Serves the registry on GET requests
+    """
+
+    registry : MetricsRegistry = REGISTRY
+
+    def do_GET( self ):
+        body = self.registry.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header( "Content-Type", "text/plain; version=0.0.4; charset=utf-8" )
+        self.send_header( "Content-Length", str(len(body)) )
+        self.end_headers()
+        self.wfile.write( body )
+
+    def log_message( self, format, *args ):
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn,socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class MetricsServer(_RohanThreading):
+
+    """
+    Local endpoint exposing a registry in the Prometheus text format
+    :param address: (host, port) to serve HTTP on, or the path of a Unix socket
+    :param registry: Registry to expose
+    """
+
+    process_name    : str = "metrics server"
+    address         : Union[ Tuple[str,int], str ]
+
+    def __init__(
+        self,
+        address     : Union[ Tuple[str,int], str ] = ( "127.0.0.1", 9464 ),
+        registry    : MetricsRegistry = REGISTRY,
+    ):
+        _RohanThreading.__init__( self )
+        self.address    = address
+        handler         = type( "_BoundMetricsHandler", ( _MetricsHandler, ), { "registry" : registry } )
+        if isinstance(address,str):
+            if os.path.exists(address):
+                os.unlink(address)
+            self.server = _UnixHTTPServer( address, handler )
+        else:
+            self.server = ThreadingHTTPServer( tuple(address), handler )
+        self.add_threaded_method( target=self.server.serve_forever, name=f"{self.process_name} serve" )
+
+    def __enter__( self ):
+        self.start_spin()
+        return self
+
+    def __exit__( self, exception_type, exception_value, traceback ):
+        self.server.shutdown()
+        self.stop_spin()
+        self.server.server_close()
+        if isinstance(self.address,str) and os.path.exists(self.address):
+            os.unlink(self.address)
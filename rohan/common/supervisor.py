@@ -0,0 +1,367 @@
+import multiprocessing
+import threading
+from rohan.common.base          import _RohanBase
+from rohan.common.base_stacks   import ThreadedStackBase
+from rohan.common.connections   import CONNECTIONS
+from rohan.common.logging       import Logger
+from rohan.data.classes         import StackConfiguration
+from rohan.utils                import clock
+from rohan.utils.clock          import now, set_epoch
+from queue                      import Empty
+from time                       import perf_counter
+from typing                     import Optional, Dict, Any, Type, List
+
+
+class _ForwardingLogger(Logger):
+
+    """
+    Logger used within supervisor worker processes which forwards messages to the supervisor's shared logger
+    :param log_queue: Multiprocessing queue drained by the supervisor
+    """
+
+    process_name : str = "forwarding logger"
+
+    def __init__(
+        self,
+        log_queue : Any,
+    ):
+        Logger.__init__( self )
+        self.forward_queue = log_queue
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, exception, exception_value, traceback ):
+        pass
+
+    def write(
+        self,
+        msg          : str,
+        process_name : str = " ",
+        stamp        : Optional[float] = None,
+    ):
+        try:
+            # >> NOTE: Messages carry the time they were written, as they reach the supervisor's logger only once forwarded
+            self.forward_queue.put_nowait( ( process_name, msg, now() if stamp is None else stamp ) )
+        except Exception:
+            pass
+
+
+def _stack_worker(
+    stack_class     : Type[ThreadedStackBase],
+    process_name    : str,
+    config          : StackConfiguration,
+    stack_kwargs    : Dict[str,Any],
+    log_queue       : Any,
+    stop_event      : Any,
+    tick_count      : Any,
+    epoch           : float,
+) -> None:
+    """
+    Entry point of supervisor worker processes -- spins a single stack until the supervisor signals it to stop
+    """
+    # >> NOTE: now() is shared by every process of the host, so adopting the supervisor's epoch makes stamps relative to it comparable
+    set_epoch( epoch )
+    stack               = stack_class( config=config, logger=_ForwardingLogger( log_queue ), **stack_kwargs )
+    stack.process_name  = process_name
+    with stack:
+        while not stop_event.wait( timeout=0.1 ) and not stack.stopping:
+            tick_count.value = stack.tick_count
+    tick_count.value = stack.tick_count
+
+
+class _HostedStack:
+    """
+    Bookkeeping of a stack instance hosted by the supervisor
+    """
+
+    def __init__(
+        self,
+        name            : str,
+        stack_class     : Type[ThreadedStackBase],
+        config          : StackConfiguration,
+        stack_kwargs    : Dict[str,Any],
+        in_process      : bool,
+    ):
+        self.name           = name
+        self.stack_class    = stack_class
+        self.config         = config
+        self.stack_kwargs   = stack_kwargs
+        self.in_process     = in_process
+        self.stack          : Optional[ThreadedStackBase] = None
+        self.worker         : Optional[Any] = None
+        self.stop_event     : Optional[Any] = None
+        self.tick_count     : Optional[Any] = None
+        self.running        = False
+        self.last_ticks     = 0
+        self.last_time      = perf_counter()
+
+    @property
+    def process_name( self ) -> str:
+        return f"{self.stack_class.process_name} [{self.name}]"
+
+    @property
+    def ticks( self ) -> int:
+        if self.in_process:
+            return self.stack.tick_count if self.stack is not None else 0
+        return self.tick_count.value if self.tick_count is not None else 0
+
+
+class StackSupervisor(_RohanBase):
+
+    """
+    Supervisor hosting many named threaded stacks within one host -- either as threads of this process or spread across worker processes
+    -- every stack writes to the supervisor's single logger and has its own StackConfiguration. Stacks hosted in worker processes must be
+    importable (module-level) classes with picklable configurations
+    :param log_filename: Optional file name for the shared logger to write to
+    :param logger: Optional already spun-up rohan Logger() instance to share (takes precedence over log_filename)
+    :param start_method: Multiprocessing start method used for worker processes ("spawn" or "forkserver" -- "fork" is unsafe once the
+    logger and in-process stacks have spun up threads)
+    """
+
+    process_name    : str = "supervisor"
+    logger          : Optional[Logger] = None
+    stacks          : Dict[str,_HostedStack]
+
+    def __init__(
+        self,
+        log_filename    : Optional[str]     = None,
+        logger          : Optional[Logger]  = None,
+        start_method    : str               = "spawn",
+    ):
+        self.log_filename   = log_filename
+        self.logger         = logger
+        self.owns_logger    = logger is None
+        self.stacks         = {}
+        self._mp_context    = multiprocessing.get_context( start_method )
+        self._log_queue     = None
+        self._forwarder     : Optional[threading.Thread] = None
+        self._sigterm       = threading.Event()
+        self._lock          = threading.Lock()
+
+    def __enter__( self ):
+        if self.owns_logger:
+            self.logger = Logger( self.log_filename ).__enter__()
+        self._sigterm.clear()
+        return self
+
+    def __exit__( self, exception_type, exception_value, traceback ):
+        for name in list(self.stacks):
+            self.stop( name )
+        # >> NOTE: Connections kept by the supervised stacks are released with the supervisor rather than at interpreter shutdown
+        n_closed = CONNECTIONS.close_all()
+        if n_closed > 0:
+            self._write( f'Closed {n_closed} kept connection(s)' )
+        self._sigterm.set()
+        if self._forwarder is not None:
+            self._forwarder.join()
+            self._forwarder = None
+        if self.owns_logger and isinstance(self.logger,Logger):
+            self.logger.__exit__( exception_type, exception_value, traceback )
+
+    def _write( self, msg : str ) -> None:
+        if isinstance(self.logger,Logger):
+            self.logger.write(
+                msg,
+                process_name=self.process_name
+            )
+
+    def _forward_logs( self ) -> None:
+        """
+        Drains messages of worker processes into the shared logger
+        """
+        while not self._sigterm.is_set() or not self._log_queue.empty():
+            try:
+                process_name, msg, stamp = self._log_queue.get( timeout=0.1 )
+            except Empty:
+                continue
+            if isinstance(self.logger,Logger):
+                self.logger.write( msg, process_name=process_name, stamp=stamp )
+
+    def add(
+        self,
+        name            : str,
+        stack_class     : Type[ThreadedStackBase],
+        config          : StackConfiguration,
+        in_process      : bool = True,
+        start           : bool = False,
+        **stack_kwargs,
+    ) -> None:
+        """
+        Adds a named stack instance
+        :param name: Unique name of the instance
+        :param stack_class: ThreadedStackBase subclass to host
+        :param config: configuration as rohan StackConfiguration() dataclass
+        :param in_process: True to host the stack as threads of this process, False to host it in a worker process
+        :param start: True to spin the stack up immediately
+        :param stack_kwargs: Additional initializer kwargs of the stack (e.g. spin_intrvl)
+        """
+        if not issubclass(stack_class,ThreadedStackBase):
+            raise TypeError(f"Supervised stacks must subclass {ThreadedStackBase}: Provided class is {stack_class}")
+        with self._lock:
+            if name in self.stacks:
+                raise KeyError(f"A stack named {name} is already supervised")
+            self._check_metrics_address( name, config )
+            self.stacks[name] = _HostedStack( name, stack_class, config, stack_kwargs, in_process )
+        if start:
+            self.start( name )
+
+    def _check_metrics_address( 
+        self, 
+        name    : str, 
+        config  : StackConfiguration,
+    ) -> None:
+        """
+        Ensures no two supervised stacks serve metrics on the same address, as the second would fail to bind -- in-process stacks
+        share one registry, so a single one of them needs an address
+        :raises ValueError: if another stack is configured with the same metrics_address
+        """
+        address = config.metrics_address
+        if address is None:
+            return
+        address = address if isinstance(address,str) else tuple(address)
+        for other, hosted in self.stacks.items():
+            other_address = hosted.config.metrics_address
+            if other_address is not None and not isinstance(other_address,str):
+                other_address = tuple(other_address)
+            if other != name and other_address == address:
+                raise ValueError(f"Stack {name} is configured to serve metrics on {address}, which is already used by stack {other}")
+
+    def remove( self, name : str ) -> None:
+        """
+        Stops and removes a named stack instance
+        """
+        self.stop( name )
+        with self._lock:
+            del self.stacks[name]
+
+    def start( self, name : str ) -> None:
+        """
+        Spins up a named stack instance
+        """
+        hosted = self.stacks[name]
+        if hosted.running:
+            return
+        if hosted.in_process:
+            hosted.stack = hosted.stack_class( config=hosted.config, logger=self.logger, **hosted.stack_kwargs )
+            hosted.stack.process_name = hosted.process_name
+            hosted.stack.__enter__()
+        else:
+            if self._log_queue is None:
+                self._log_queue = self._mp_context.Queue()
+            if self._forwarder is None:
+                self._forwarder = threading.Thread( target=self._forward_logs, name=f"{self.process_name} log forwarding" )
+                self._forwarder.start()
+            hosted.stop_event   = self._mp_context.Event()
+            hosted.tick_count   = self._mp_context.Value( "q", 0 )
+            hosted.worker       = self._mp_context.Process(
+                target  = _stack_worker,
+                name    = hosted.process_name,
+                args    = (
+                    hosted.stack_class, hosted.process_name, hosted.config, hosted.stack_kwargs,
+                    self._log_queue, hosted.stop_event, hosted.tick_count, clock.EPOCH
+                ),
+                daemon  = True,
+            )
+            hosted.worker.start()
+        hosted.running      = True
+        hosted.last_ticks   = 0
+        hosted.last_time    = perf_counter()
+        self._write( f'Started {hosted.process_name} ({"in-process" if hosted.in_process else "worker process"})' )
+
+    def stop(
+        self,
+        name    : str,
+        timeout : Optional[float] = 5.0,
+    ) -> None:
+        """
+        Spins down a named stack instance
+        :param timeout: Time waited on a worker process before it is terminated
+        """
+        hosted = self.stacks[name]
+        if not hosted.running:
+            return
+        if hosted.in_process:
+            hosted.stack.__exit__( None, None, None )
+        else:
+            hosted.stop_event.set()
+            hosted.worker.join( timeout=timeout )
+            if hosted.worker.is_alive():
+                self._write( f'{hosted.process_name} did not stop within {timeout} s ... terminating worker process' )
+                hosted.worker.terminate()
+                hosted.worker.join()
+        hosted.running = False
+        self._write( f'Stopped {hosted.process_name}' )
+
+    def reconfigure(
+        self,
+        name    : str,
+        config  : StackConfiguration,
+    ) -> None:
+        """
+        Replaces the configuration of a named stack instance, restarting it if it was running
+        """
+        hosted      = self.stacks[name]
+        with self._lock:
+            self._check_metrics_address( name, config )
+        was_running = hosted.running
+        self.stop( name )
+        hosted.config = config
+        self._write( f'Reconfigured {hosted.process_name}' )
+        if was_running:
+            self.start( name )
+
+    def _reap_stacks( self ) -> List[str]:
+        """
+        Marks stacks whose worker process died or whose spin thread exited as no longer running and logs why
+        :returns Names of the stacks found dead
+        """
+        dead = []
+        for name, hosted in list( self.stacks.items() ):
+            if not hosted.running:
+                continue
+            if hosted.in_process:
+                if any( thread.is_alive() for thread in hosted.stack.threads ):
+                    continue
+                reason = "was safe stopped" if hosted.stack.stopping else "spin thread exited unexpectedly"
+                hosted.stack.__exit__( None, None, None )
+            else:
+                if hosted.worker.is_alive():
+                    continue
+                hosted.worker.join()
+                reason = f"worker process exited unexpectedly with exit code {hosted.worker.exitcode}"
+            hosted.running = False
+            dead.append( name )
+            self._write( f'{hosted.process_name} {reason}' )
+        return dead
+
+    def throughput( self ) -> Dict[str,float]:
+        """
+        Ticks per second of every running stack since the previous call, along with their aggregate under "total"
+        :returns Dictionary of tick rates keyed by stack name
+        """
+        self._reap_stacks()
+        rates   = {}
+        now     = perf_counter()
+        for name, hosted in list( self.stacks.items() ):
+            if not hosted.running:
+                continue
+            ticks               = hosted.ticks
+            elapsed             = now - hosted.last_time
+            rates[name]         = ( ticks - hosted.last_ticks ) / elapsed if elapsed > 0 else 0.0
+            hosted.last_ticks   = ticks
+            hosted.last_time    = now
+        rates["total"] = sum( rates.values() )
+        return rates
+
+    def report( self ) -> Dict[str,float]:
+        """
+        Logs and returns the throughput of every running stack
+        """
+        rates = self.throughput()
+        self._write( ", ".join( f"{name}: {rate:.1f} ticks/s" for name, rate in rates.items() ) )
+        return rates
+
+    @property
+    def names( self ) -> List[str]:
+        return list(self.stacks)
@@ -0,0 +1,265 @@
+import functools
+import json
+import os
+import threading
+import numpy as np
+from rohan.utils.clock  import now
+from typing             import Optional, Dict, List, Any, Callable, Iterable
+
+"""
+Opt-in span tracing of rohan modules exported as Chrome trace JSON (viewable in Perfetto or chrome://tracing)
+-- spans are written to per-thread preallocated arrays, so recording takes no lock and allocates nothing beyond the span handle
+"""
+
+_SPAN       = 0
+_INSTANT    = 1
+
+
+class _ThreadBuffer:
+    """
+    Preallocated span storage owned by a single thread
+    """
+
+    def __init__(
+        self,
+        capacity : int,
+    ):
+        self.thread     = threading.current_thread()
+        self.native_id  = threading.get_native_id()
+        self.starts     = np.zeros( capacity, dtype=np.float64 )
+        self.ends       = np.zeros( capacity, dtype=np.float64 )
+        self.names      = np.zeros( capacity, dtype=np.int32 )
+        self.kinds      = np.zeros( capacity, dtype=np.int8 )
+        self.size       = 0
+        self.dropped    = 0
+
+    def reserve( self ) -> int:
+        """
+        :returns Index of the next free record (-1 if the buffer is full)
+        """
+        index = self.size
+        if index >= self.starts.shape[0]:
+            self.dropped += 1
+            return -1
+        self.size = index + 1
+        return index
+
+
+class _NullSpan:
+    """
+    Span handed out while tracing is disabled
+    """
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, exception_type, exception_value, traceback ):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """
+    Span recording its end time into its thread's buffer on exit
+    """
+
+    __slots__ = ( "buffer", "index" )
+
+    def __init__(
+        self,
+        buffer  : _ThreadBuffer,
+        index   : int,
+    ):
+        self.buffer = buffer
+        self.index  = index
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, exception_type, exception_value, traceback ):
+        if self.index >= 0:
+            self.buffer.ends[self.index] = now()
+        return False
+
+
+class Tracer:
+
+    """
+    Span tracer with per-thread preallocated buffers
+    :param capacity: Number of spans and instants each thread may record before further records are dropped
+    """
+
+    enabled     : bool = False
+    capacity    : int
+
+    def __init__(
+        self,
+        capacity : int = 65536,
+    ):
+        self.capacity   = capacity
+        self.enabled    = False
+        self._local     = threading.local()
+        self._buffers   : List[_ThreadBuffer] = []
+        self._name_ids  : Dict[str,int] = {}
+        self._names     : List[str] = []
+        self._lock      = threading.Lock()
+        self._origin    = now()
+
+    def start(
+        self,
+        capacity : Optional[int] = None
+    ) -> None:
+        """
+        Clears previously recorded spans and starts recording
+        :param capacity: Optional new per-thread capacity
+        """
+        with self._lock:
+            if capacity is not None:
+                self.capacity = capacity
+            self._buffers   = []
+            self._local     = threading.local()
+            self._origin    = now()
+        self.enabled = True
+
+    def stop( self ) -> None:
+        """
+        Stops recording (recorded spans are kept for export)
+        """
+        self.enabled = False
+
+    def _buffer( self ) -> _ThreadBuffer:
+        buffer = getattr( self._local, "buffer", None )
+        if buffer is None:
+            buffer = self._local.buffer = _ThreadBuffer( self.capacity )
+            with self._lock:
+                self._buffers.append( buffer )
+        return buffer
+
+    def _name_id( self, name : str ) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            with self._lock:
+                name_id = self._name_ids.setdefault( name, len(self._names) )
+                if name_id == len(self._names):
+                    self._names.append( name )
+        return name_id
+
+    def span( self, name : str ) -> Any:
+        """
+        Context manager recording a span around its body
+        :param name: Name of the span
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        buffer  = self._buffer()
+        index   = buffer.reserve()
+        if index >= 0:
+            buffer.names[index]     = self._name_id( name )
+            buffer.kinds[index]     = _SPAN
+            buffer.starts[index]    = now()
+            buffer.ends[index]      = buffer.starts[index]
+        return _Span( buffer, index )
+
+    def instant( self, name : str ) -> None:
+        """
+        Records a point event (e.g. a queue handoff)
+        :param name: Name of the event
+        """
+        if not self.enabled:
+            return
+        buffer  = self._buffer()
+        index   = buffer.reserve()
+        if index >= 0:
+            buffer.names[index]     = self._name_id( name )
+            buffer.kinds[index]     = _INSTANT
+            buffer.starts[index]    = buffer.ends[index] = now()
+
+    @property
+    def dropped( self ) -> int:
+        """
+        Number of records dropped because a thread's buffer was full
+        """
+        return sum( buffer.dropped for buffer in self._buffers )
+
+    def events( self ) -> List[Dict[str,Any]]:
+        """
+        Recorded spans in the Chrome trace event format
+        """
+        pid     = os.getpid()
+        events  = []
+        with self._lock:
+            buffers = list( self._buffers )
+            names   = list( self._names )
+        for buffer in buffers:
+            events.append( { "name" : "thread_name", "ph" : "M", "pid" : pid, "tid" : buffer.native_id, "args" : { "name" : buffer.thread.name } } )
+            size    = buffer.size
+            starts  = ( buffer.starts[:size] - self._origin ) * 1e6
+            ends    = ( buffer.ends[:size] - self._origin ) * 1e6
+            for start, end, name_id, kind in zip( starts.tolist(), ends.tolist(), buffer.names[:size].tolist(), buffer.kinds[:size].tolist() ):
+                if kind == _SPAN:
+                    events.append( { "name" : names[name_id], "ph" : "X", "ts" : start, "dur" : end - start, "pid" : pid, "tid" : buffer.native_id } )
+                else:
+                    events.append( { "name" : names[name_id], "ph" : "i", "s" : "t", "ts" : start, "pid" : pid, "tid" : buffer.native_id } )
+        return events
+
+    def export_chrome( self, filename : str ) -> int:
+        """
+        Writes recorded spans as Chrome trace JSON
+        :param filename: Path of the JSON file
+        :returns Number of events written
+        """
+        events = self.events()
+        with open( filename, "w" ) as file:
+            json.dump( { "traceEvents" : events, "displayTimeUnit" : "ms" }, file )
+        return len(events)
+
+    def traced( self, name : Optional[str] = None ) -> Callable:
+        """
+        Decorator recording a span around every call of a function while tracing is enabled
+        :param name: Name of the span (defaults to the function's qualified name)
+        """
+        def decorator( function : Callable ) -> Callable:
+            span_name = name if name is not None else function.__qualname__
+
+            @functools.wraps( function )
+            def wrapper( *args, **kwargs ):
+                if not self.enabled:
+                    return function( *args, **kwargs )
+                with self.span( span_name ):
+                    return function( *args, **kwargs )
+            return wrapper
+        return decorator
+
+    def instrument(
+        self,
+        obj         : Any,
+        prefix      : str,
+        methods     : Optional[Iterable[str]] = None,
+        stop_at     : Optional[type] = None,
+    ) -> List[str]:
+        """
+        Wraps methods of an object so each call records a span named "<prefix>.<method>"
+        :param obj: Object to instrument
+        :param prefix: Prefix of the span names
+        :param methods: Names of the methods to wrap (defaults to the public methods defined by classes of obj deriving from stop_at)
+        :param stop_at: Base class whose own methods are not wrapped by default
+        :returns Names of the wrapped methods
+        """
+        if methods is None:
+            methods = set()
+            for cls in type(obj).__mro__:
+                if stop_at is not None and ( cls is stop_at or not issubclass(cls,stop_at) ):
+                    break
+                methods.update( key for key, value in vars(cls).items() if not key.startswith("_") and callable(value) )
+        wrapped = []
+        for method in sorted(methods):
+            bound = getattr( obj, method, None )
+            if callable(bound):
+                setattr( obj, method, self.traced( f"{prefix}.{method}" )( bound ) )
+                wrapped.append( method )
+        return wrapped
+
+
+TRACER = Tracer()
@@ -8,4 +8,6 @@ Type aliases used in the package
 Config      = Dict[ str, Optional[ Union[ float , str ]]]
 Joints      = Union[ List[ float ], NDArray ]
 Resolution  = Tuple[ int, int ]
+Intrinsics  = Tuple[ float, float, float, float ]
+ROI         = Tuple[ int, int, int, int ]
 
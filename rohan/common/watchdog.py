@@ -0,0 +1,233 @@
+import threading
+from rohan.common.base      import _RohanThreading
+from rohan.common.logging   import Logger
+from rohan.utils.timers     import IntervalTimer
+from enum                   import Enum
+from time                   import perf_counter
+from typing                 import Optional, Dict, List, Callable, Any
+
+
+class WatchdogAction(str,Enum):
+    """
+    Actions taken by the watchdog when a component misses its deadline budget
+    """
+    LOG     = "log"
+    SKIP    = "skip"
+    RESTART = "restart"
+    STOP    = "stop"
+
+
+class _WatchdogEntry:
+    """
+    Monitoring state of a single watched component
+    """
+
+    def __init__(
+        self,
+        name        : str,
+        budget      : float,
+        action      : WatchdogAction,
+        component   : Optional[Any] = None,
+    ):
+        self.name       = name
+        self.budget     = budget
+        self.action     = action
+        self.component  = component
+        self.last_beat  = perf_counter()
+        self.tick_start = None
+        self.ticked     = False
+        self.tripped    = False
+        self.misses     = 0
+
+
+class Watchdog(_RohanThreading):
+
+    """
+    Watchdog tracking heartbeats and deadline budgets of stack components
+    -- heartbeats are posted with beat() (or _RohanThreading.heartbeat()) and ticks are bracketed with begin_tick()/end_tick(), so a
+    component whose heartbeat is older than its budget, whose tick overruns its budget, or whose threads died while spinning, triggers
+    its configured action. Skip, restart and stop requests are serviced by the stack between ticks through consume_skip(),
+    consume_restarts() and stop_requested. The watchdog is created disarmed so slow connects are not reported as stalls -- the stack
+    arms it once every subcomponent has been entered
+    :param logger: rohan Logger() instance
+    :param check_intrvl: Inverse-frequency of the watchdog's checking loop
+    :param on_stop: Optional callable invoked (with the reason) from the watchdog thread when a safe stop is triggered
+    """
+
+    process_name    : str = "watchdog"
+    logger          : Optional[Logger]
+    check_intrvl    : float
+    entries         : Dict[str,_WatchdogEntry]
+    stop_requested  : bool = False
+
+    def __init__(
+        self,
+        logger          : Optional[Logger]                  = None,
+        check_intrvl    : float                             = 0.01,
+        on_stop         : Optional[Callable[[str],None]]    = None,
+    ):
+        _RohanThreading.__init__( self )
+        self.logger             = logger
+        self.check_intrvl       = check_intrvl
+        self.on_stop            = on_stop
+        self.entries            = {}
+        self.stop_requested     = False
+        self._armed             = False
+        self._pending_skip      = False
+        self._pending_restarts  : List[_WatchdogEntry] = []
+        self._lock              = threading.Lock()
+        self.add_threaded_method( target=self.spin, name=f"{self.process_name} checking loop" )
+
+    def __enter__( self ):
+        self.start_spin()
+        return self
+
+    def __exit__( self, exception_type, exception_value, traceback ):
+        self.disarm()
+        self.stop_spin()
+
+    def register(
+        self,
+        name        : str,
+        budget      : float,
+        action      : WatchdogAction    = WatchdogAction.LOG,
+        component   : Optional[Any]     = None,
+    ) -> None:
+        """
+        Starts monitoring a component
+        :param name: Name the component posts heartbeats under
+        :param budget: Maximum time allowed between heartbeats (or duration of a tick)
+        :param action: Action taken when the budget is exceeded
+        :param component: Optional component whose threads are checked for liveness and whose context is restarted
+        """
+        with self._lock:
+            self.entries[name] = _WatchdogEntry( name=name, budget=budget, action=WatchdogAction(action), component=component )
+        if isinstance(component,_RohanThreading):
+            component.watchdog      = self
+            component.watchdog_name = name
+
+    def arm( self ) -> None:
+        """
+        Starts triggering actions -- heartbeats are reset to now so time spent before arming does not count against the budgets
+        """
+        with self._lock:
+            start = perf_counter()
+            for entry in self.entries.values():
+                entry.last_beat = start
+                entry.tripped   = False
+        self._armed = True
+
+    def disarm( self ) -> None:
+        """
+        Stops triggering actions -- called before components are unravelled so shutdown is not reported as a stall
+        """
+        self._armed = False
+
+    def beat( self, name : Optional[str] ) -> None:
+        """
+        Posts a heartbeat for a component
+        :param name: Name the component was registered with
+        """
+        entry = self.entries.get(name)
+        if entry is not None:
+            entry.last_beat = perf_counter()
+            entry.tripped   = False
+
+    def begin_tick( self, name : str ) -> None:
+        """
+        Marks the start of a tick of a component (e.g. the stack's process()) -- a tick still running after the budget is reported as a stall
+        :param name: Name the component was registered with
+        """
+        entry = self.entries.get(name)
+        if entry is not None:
+            entry.ticked        = True
+            entry.tripped       = False
+            entry.tick_start    = perf_counter()
+
+    def end_tick( self, name : str ) -> Optional[float]:
+        """
+        Marks the end of a tick of a component and triggers its action when the tick was over budget
+        :param name: Name the component was registered with
+        :returns Duration of the tick (None if the component is not watched)
+        """
+        entry = self.entries.get(name)
+        if entry is None or entry.tick_start is None:
+            return None
+        duration, entry.tick_start = perf_counter() - entry.tick_start, None
+        if duration > entry.budget and not entry.tripped:
+            self._trigger( entry, f'tick took {1e3*duration:.3f} ms of a {1e3*entry.budget:.3f} ms budget' )
+        return duration
+
+    def consume_skip( self ) -> bool:
+        """
+        :returns True (once) if a skip of the next tick was requested
+        """
+        with self._lock:
+            skip, self._pending_skip = self._pending_skip, False
+        return skip
+
+    def consume_restarts( self ) -> List[Any]:
+        """
+        :returns Components (once) whose contexts were requested to be restarted
+        """
+        with self._lock:
+            restarts, self._pending_restarts = self._pending_restarts, []
+        return [ entry.component for entry in restarts if entry.component is not None ]
+
+    def _trigger(
+        self,
+        entry   : _WatchdogEntry,
+        reason  : str
+    ) -> None:
+        """
+        Applies the configured action of a component which missed its budget
+        """
+        if not self._armed:
+            return
+        entry.misses += 1
+        if isinstance(self.logger,Logger):
+            self.logger.write(
+                f'{entry.name} missed its deadline ({reason}) -- action: {entry.action.value}',
+                process_name=self.process_name
+            )
+        with self._lock:
+            if entry.action is WatchdogAction.SKIP:
+                self._pending_skip = True
+            elif entry.action is WatchdogAction.RESTART and entry not in self._pending_restarts:
+                self._pending_restarts.append( entry )
+        if entry.action is WatchdogAction.STOP and not self.stop_requested:
+            self.stop_requested = True
+            if self.on_stop is not None:
+                self.on_stop( f'{entry.name} missed its deadline ({reason})' )
+
+    def spin( self ) -> None:
+        check_timer = IntervalTimer( interval=self.check_intrvl )
+        while not self.sigterm.is_set():
+            check_timer.await_interval()
+            if not self._armed:
+                continue
+            now = perf_counter()
+            for entry in list( self.entries.values() ):
+                if entry.tripped:
+                    continue
+                component = entry.component
+                if isinstance(component,_RohanThreading) and not component.sigterm.is_set():
+                    dead = [ thread.name for thread in component.threads if thread.ident is not None and not thread.is_alive() ]
+                    if dead:
+                        entry.tripped = True
+                        self._trigger( entry, f'thread(s) {dead} died' )
+                        continue
+                if entry.ticked:
+                    tick_start = entry.tick_start
+                    if tick_start is not None and now - tick_start > entry.budget:
+                        entry.tripped = True
+                        self._trigger( entry, f'tick running for {1e3*(now-tick_start):.3f} ms of a {1e3*entry.budget:.3f} ms budget' )
+                elif now - entry.last_beat > entry.budget:
+                    entry.tripped = True
+                    self._trigger( entry, f'no heartbeat for {1e3*(now-entry.last_beat):.3f} ms of a {1e3*entry.budget:.3f} ms budget' )
+
+    def stats( self ) -> Dict[str,int]:
+        """
+        :returns Number of missed deadlines per watched component
+        """
+        return { name : entry.misses for name, entry in self.entries.items() }
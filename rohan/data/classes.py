@@ -1,11 +1,14 @@
 from dataclasses                    import dataclass, field
-from typing                         import Optional, Union, List, Dict, Any
+from typing                         import Optional, Union, List, Dict, Any, Tuple
 from rohan.common.type_aliases      import Config
 from rohan.common.base_cameras      import CameraBase
 from rohan.common.base_controllers  import ControllerBase
 from rohan.common.base_guidances    import GuidanceBase
 from rohan.common.base_navigations  import NavigationBase
 from rohan.common.base_networks     import NetworkBase
+from rohan.utils.scheduling         import ThreadPolicy, as_thread_policy
+from rohan.utils.quality            import QualityLevel
+from rohan.utils.change_detection   import ChangeDetector
 
 @dataclass
 class StackConfiguration:
@@ -13,6 +16,10 @@ class StackConfiguration:
     Configuration dataclass for stacks to load 
     """
     log_filename         : Optional[str]                                                                            = None
+    log_max_bytes        : int                                                                                      = -1
+    log_rotate_intrvl    : float                                                                                    = -1
+    log_backup_count     : int                                                                                      = -1
+    log_compression      : Optional[str]                                                                            = "gzip"
     network_configs      : Union[ Config, List[Config], Dict[Any,Config] ]                                          = field(default_factory=dict)
     camera_configs       : Union[ Config, List[Config], Dict[Any,Config] ]                                          = field(default_factory=dict)
     controller_configs   : Union[ Config, List[Config], Dict[Any,Config] ]                                          = field(default_factory=dict)
@@ -22,4 +29,21 @@ class StackConfiguration:
     camera_classes       : Optional[ Union[ CameraBase, List[CameraBase], Dict[Any,CameraBase] ] ]                  = None
     controller_classes   : Optional[ Union[ ControllerBase, List[ControllerBase], Dict[Any,ControllerBase] ] ]      = None
     guidance_classes     : Optional[ Union[ GuidanceBase, List[GuidanceBase], Dict[Any,GuidanceBase] ] ]            = None
-    navigation_classes   : Optional[ Union[ NavigationBase, List[NavigationBase], Dict[Any,NavigationBase] ] ]      = None
\ No newline at end of file
+    navigation_classes   : Optional[ Union[ NavigationBase, List[NavigationBase], Dict[Any,NavigationBase] ] ]      = None
+    watchdog_budgets     : Dict[ str, float ]                                                                       = field(default_factory=dict)
+    watchdog_actions     : Dict[ str, str ]                                                                         = field(default_factory=dict)
+    watchdog_intrvl      : float                                                                                    = 0.01
+    thread_policies      : Dict[ str, ThreadPolicy ]                                                                = field(default_factory=dict)
+    quality_ladder       : List[ QualityLevel ]                                                                     = field(default_factory=list)
+    quality_budget       : Optional[float]                                                                          = None
+    metrics_address      : Optional[ Union[ Tuple[ str, int ], str ] ]                                              = None
+    trace_filename       : Optional[str]                                                                            = None
+    trace_capacity       : int                                                                                      = 65536
+    keep_connections     : bool                                                                                     = False
+    change_gating        : Dict[ str, ChangeDetector ]                                                              = field(default_factory=dict)
+    change_max_skips     : int                                                                                      = 30
+    buffer_pool_bytes    : int                                                                                      = -1
+
+    def __post_init__( self ):
+        # >> NOTE: Policies loaded from JSON or YAML arrive as plain mappings
+        self.thread_policies = { name : as_thread_policy( policy ) for name, policy in self.thread_policies.items() }
@@ -0,0 +1,187 @@
+import threading
+import numpy as np
+from collections    import OrderedDict
+from typing         import Dict, Tuple, Any
+from numpy.typing   import NDArray, DTypeLike
+
+"""
+Stack-scoped pool of reusable NumPy buffers leased by (shape, dtype)
+-- components lease buffers once and hand them back when done, so frames, point clouds and other per-tick arrays reuse memory
+instead of churning the allocator
+"""
+
+Key = Tuple[ Tuple[int,...], str ]
+
+
+class Lease:
+
+    """
+    Reference counted hold on a pooled buffer -- the buffer returns to its pool once every holder released it
+    -- usable as a context manager yielding the array and releasing on exit
+    """
+
+    __slots__ = ( "array", "key", "refs", "pool", "pooled" )
+
+    def __init__(
+        self,
+        array   : NDArray,
+        key     : Key,
+        pool    : "BufferPool",
+        pooled  : bool,
+    ):
+        self.array  = array
+        self.key    = key
+        self.refs   = 1
+        self.pool   = pool
+        self.pooled = pooled
+
+    def retain( self ) -> "Lease":
+        """
+        Adds a holder (e.g. before handing the buffer to another thread)
+        """
+        with self.pool._lock:
+            if self.refs <= 0:
+                raise RuntimeError("Cannot retain a buffer which was already returned to its pool")
+            self.refs += 1
+        return self
+
+    def release( self ) -> None:
+        """
+        Drops a holder -- the last release returns the buffer to the pool
+        """
+        self.pool._release( self )
+
+    def __enter__( self ) -> NDArray:
+        return self.array
+
+    def __exit__( self, exception_type, exception_value, traceback ):
+        self.release()
+        return False
+
+
+class BufferPool:
+
+    """
+    Pool of NumPy buffers keyed by shape and dtype with an optional cap on pooled memory
+    -- when a lease would exceed the cap, idle buffers of other shapes are evicted (least recently returned first), and if that does
+    not suffice the buffer is allocated outside the pool and simply dropped on release
+    :param max_bytes: Cap on the bytes held by the pool, leased and idle (non-positive leaves the pool uncapped)
+    """
+
+    max_bytes : int
+
+    def __init__(
+        self,
+        max_bytes : int = -1,
+    ):
+        self.max_bytes          = max_bytes
+        self._free              : "OrderedDict[Key,list]" = OrderedDict()
+        self._lock              = threading.Lock()
+        self.leased_bytes       = 0
+        self.idle_bytes         = 0
+        self.high_water_bytes   = 0
+        self.leases             = 0
+        self.reuses             = 0
+        self.allocations        = 0
+        self.evictions          = 0
+        self.unpooled           = 0
+
+    @staticmethod
+    def key(
+        shape   : Tuple[int,...],
+        dtype   : DTypeLike,
+    ) -> Key:
+        return ( tuple( int(size) for size in shape ), np.dtype(dtype).str )
+
+    def lease(
+        self,
+        shape   : Tuple[int,...],
+        dtype   : DTypeLike = np.float32,
+    ) -> Lease:
+        """
+        Leases a buffer of a given shape and dtype -- its contents are undefined
+        :param shape: Shape of the buffer
+        :param dtype: Dtype of the buffer
+        :returns Lease holding the buffer as its array attribute
+        """
+        key     = self.key( shape, dtype )
+        nbytes  = int( np.prod( key[0], dtype=np.int64 ) ) * np.dtype(dtype).itemsize
+        with self._lock:
+            self.leases += 1
+            free = self._free.get(key)
+            if free:
+                array = free.pop()
+                if not free:
+                    del self._free[key]
+                self.idle_bytes     -= nbytes
+                self.leased_bytes   += nbytes
+                self.reuses         += 1
+                return Lease( array, key, self, pooled=True )
+            pooled = self._make_room( nbytes )
+            if pooled:
+                self.leased_bytes       += nbytes
+                self.allocations        += 1
+                self.high_water_bytes   = max( self.high_water_bytes, self.leased_bytes + self.idle_bytes )
+            else:
+                self.unpooled += 1
+        # >> NOTE: Allocation happens outside the lock so large buffers do not stall other threads' leases
+        return Lease( np.empty( key[0], dtype=dtype ), key, self, pooled=pooled )
+
+    def _make_room( self, nbytes : int ) -> bool:
+        """
+        Evicts idle buffers until nbytes fit under the cap -- to be called under the lock
+        :returns True if the buffer fits within the pool
+        """
+        if self.max_bytes <= 0:
+            return True
+        if self.leased_bytes + nbytes > self.max_bytes:
+            return False
+        while self.leased_bytes + self.idle_bytes + nbytes > self.max_bytes and self._free:
+            key, free = next( iter( self._free.items() ) )
+            array = free.pop()
+            if not free:
+                del self._free[key]
+            self.idle_bytes -= array.nbytes
+            self.evictions  += 1
+        return True
+
+    def _release( self, lease : Lease ) -> None:
+        with self._lock:
+            if lease.refs <= 0:
+                raise RuntimeError("Buffer was already returned to its pool")
+            lease.refs -= 1
+            if lease.refs > 0 or not lease.pooled:
+                return
+            nbytes              = lease.array.nbytes
+            self.leased_bytes   -= nbytes
+            self.idle_bytes     += nbytes
+            self._free.setdefault( lease.key, [] ).append( lease.array )
+            self._free.move_to_end( lease.key )
+        lease.array = None
+
+    def clear( self ) -> int:
+        """
+        Drops every idle buffer
+        :returns Number of bytes freed
+        """
+        with self._lock:
+            freed           = self.idle_bytes
+            self._free      = OrderedDict()
+            self.idle_bytes = 0
+        return freed
+
+    def stats( self ) -> Dict[str,Any]:
+        """
+        :returns Dictionary of leased, idle and high-water bytes along with lease, reuse, allocation, eviction and unpooled counts
+        """
+        with self._lock:
+            return {
+                "leased_bytes"      : self.leased_bytes,
+                "idle_bytes"        : self.idle_bytes,
+                "high_water_bytes"  : self.high_water_bytes,
+                "leases"            : self.leases,
+                "reuses"            : self.reuses,
+                "allocations"       : self.allocations,
+                "evictions"         : self.evictions,
+                "unpooled"          : self.unpooled,
+            }
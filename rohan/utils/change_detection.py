@@ -0,0 +1,95 @@
+import numpy as np
+from typing         import Optional, Dict
+from numpy.typing   import NDArray
+
+"""
+Cheap per-frame change detection used to gate processing of static scenes
+-- frames are reduced to a strided grayscale thumbnail which is compared against the thumbnail of the last frame reported as changed,
+so slow drifts accumulate until they cross the threshold instead of slipping through frame by frame
+"""
+
+
+class ChangeDetector:
+
+    """
+    Detects whether a frame differs from the last changed frame beyond a threshold
+    -- intended to run on the capture thread (see CameraBase.publish_frame), where it costs one strided pass over the frame
+    :param threshold: Mean absolute difference of thumbnail intensities (in the frame's raw units) above which a frame counts as changed
+    :param stride: Integer decimation of rows and columns used to build the thumbnail
+    """
+
+    threshold   : float
+    stride      : int
+    frames      : int = 0
+    changes     : int = 0
+    difference  : float = 0.0
+
+    def __init__(
+        self,
+        threshold   : float = 2.0,
+        stride      : int   = 8,
+    ):
+        if stride < 1:
+            raise ValueError(f"Change detection stride must be a positive integer: Provided {stride}")
+        self.threshold  = threshold
+        self.stride     = stride
+        self.frames     = 0
+        self.changes    = 0
+        self.difference = 0.0
+        self._thumbnail : Optional[NDArray] = None
+        self._reference : Optional[NDArray] = None
+        self._scratch   : Optional[NDArray] = None
+
+    def thumbnail( self, frame : NDArray ) -> NDArray:
+        """
+        Strided grayscale thumbnail of a frame written into a preallocated buffer
+        :param frame: Frame of shape (height, width) or (height, width, channels)
+        """
+        view    = frame[ ::self.stride, ::self.stride ]
+        shape   = view.shape[:2]
+        if self._thumbnail is None or self._thumbnail.shape != shape:
+            self._thumbnail = np.empty( shape, dtype=np.float32 )
+            self._reference = None
+            self._scratch   = np.empty( shape, dtype=np.float32 )
+        if view.ndim == 3:
+            np.mean( view, axis=2, out=self._thumbnail )
+        else:
+            np.copyto( self._thumbnail, view, casting="unsafe" )
+        return self._thumbnail
+
+    def update( self, frame : NDArray ) -> bool:
+        """
+        Compares a frame against the last changed frame
+        :param frame: Frame of shape (height, width) or (height, width, channels)
+        :returns True if the frame changed beyond the threshold (always True for the first frame of a given shape)
+        """
+        thumbnail   = self.thumbnail( frame )
+        self.frames += 1
+        if self._reference is None:
+            self.difference = float("inf")
+        else:
+            np.subtract( thumbnail, self._reference, out=self._scratch )
+            np.abs( self._scratch, out=self._scratch )
+            self.difference = float( self._scratch.mean() )
+            if self.difference <= self.threshold:
+                return False
+        # >> NOTE: Buffers are swapped rather than copied so the changed thumbnail becomes the new reference
+        self._reference, self._thumbnail = thumbnail, self._reference if self._reference is not None else np.empty_like( thumbnail )
+        self.changes += 1
+        return True
+
+    def reset( self ) -> None:
+        """
+        Forgets the reference so the next frame counts as changed
+        """
+        self._reference = None
+
+    def stats( self ) -> Dict[str,float]:
+        """
+        :returns Dictionary of frames seen, frames changed and the fraction of frames unchanged
+        """
+        return {
+            "frames"    : self.frames,
+            "changes"   : self.changes,
+            "unchanged" : 1.0 - self.changes / self.frames if self.frames > 0 else 0.0,
+        }
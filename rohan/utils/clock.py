@@ -0,0 +1,158 @@
+import threading
+import numpy as np
+from time           import perf_counter, time
+from typing         import Optional, Union, Tuple
+from numpy.typing   import NDArray
+
+"""
+Single monotonic time base shared by every rohan module, and alignment of device hardware clocks onto it
+-- stamps taken with now() are comparable across loggers, cameras, networks, controllers and traces of the same host, so
+differences between them are end-to-end latencies
+"""
+
+# >> NOTE: perf_counter is monotonic, high resolution and (on Linux) shared by every process of the host
+now = perf_counter
+
+EPOCH : float = now()
+_WALL_OFFSET : float = time() - EPOCH
+
+
+def set_epoch( epoch : float ) -> None:
+    """
+    Adopts the epoch of another process of the same host (e.g. the supervisor which spawned this one), so since_epoch() of both
+    processes line up -- to be called before any stamp is taken relative to the epoch
+    :param epoch: EPOCH of the other process
+    """
+    global EPOCH
+    EPOCH = epoch
+
+
+def since_epoch( stamp : Optional[float] = None ) -> float:
+    """
+    Seconds between the clock's epoch (import of rohan) and a stamp
+    :param stamp: Stamp on the now() time base (defaults to the current time)
+    """
+    return ( now() if stamp is None else stamp ) - EPOCH
+
+
+def to_wall( stamp : float ) -> float:
+    """
+    Wall clock (Unix) time of a stamp on the now() time base -- for display and file naming only, as the wall clock may jump
+    """
+    return stamp + _WALL_OFFSET
+
+
+class ClockAligner:
+
+    """
+    Online estimator of the offset and drift of a device clock with respect to now()
+    -- fits host = offset + rate * device by least squares over a sliding window of (device, host) stamp pairs. Transport delay
+    between the device stamping and the host receiving is absorbed into the offset, so aligned stamps share the host's time base but
+    carry the mean transport delay
+    :param window: Number of most recent stamp pairs the fit is computed over
+    :param device_scale: Seconds per device clock tick (e.g. 1e-6 for microsecond counters)
+    """
+
+    window          : int
+    device_scale    : float
+    offset          : float = 0.0
+    rate            : float = 1.0
+    samples         : int = 0
+
+    def __init__(
+        self,
+        window          : int   = 256,
+        device_scale    : float = 1.0,
+    ):
+        if window < 2:
+            raise ValueError(f"Clock alignment requires a window of at least 2 samples: Provided {window}")
+        self.window         = window
+        self.device_scale   = device_scale
+        self.offset         = 0.0
+        self.rate           = 1.0
+        self.samples        = 0
+        self._device        = np.zeros( window, dtype=np.float64 )
+        self._host          = np.zeros( window, dtype=np.float64 )
+        self._origin        : Optional[float] = None
+        self._stale         = False
+        self._lock          = threading.Lock()
+
+    def observe(
+        self,
+        device_time : float,
+        host_time   : Optional[float] = None,
+    ) -> None:
+        """
+        Records a device stamp along with the host time it was received at
+        :param device_time: Stamp of the device clock (in device ticks)
+        :param host_time: Stamp on the now() time base (defaults to the current time)
+        """
+        host_time = now() if host_time is None else host_time
+        with self._lock:
+            if self._origin is None:
+                # >> NOTE: Device stamps are stored relative to the first one so large counters keep their precision in float64
+                self._origin = device_time
+            index                   = self.samples % self.window
+            self._device[index]     = ( device_time - self._origin ) * self.device_scale
+            self._host[index]       = host_time - EPOCH
+            self.samples           += 1
+            self._stale             = True
+
+    def _fit( self ) -> None:
+        n_samples = min( self.samples, self.window )
+        if n_samples == 0:
+            raise RuntimeError("Clock alignment requires at least one observed stamp pair")
+        device  = self._device[:n_samples]
+        host    = self._host[:n_samples]
+        device_mean, host_mean = device.mean(), host.mean()
+        spread  = device - device_mean
+        var     = np.dot( spread, spread )
+        self.rate   = float( np.dot( spread, host - host_mean ) / var ) if var > 0 else 1.0
+        self.offset = float( host_mean - self.rate * device_mean )
+        self._stale = False
+
+    def estimate( self ) -> Tuple[float,float,float]:
+        """
+        Refits the window if stamp pairs were observed since the last fit
+        :returns Offset, rate and device origin of the current fit
+        """
+        with self._lock:
+            if self._stale:
+                self._fit()
+            elif self.samples == 0:
+                raise RuntimeError("Clock alignment requires at least one observed stamp pair")
+            return self.offset, self.rate, self._origin
+
+    def to_host(
+        self,
+        device_time : Union[ float, NDArray ],
+    ) -> Union[ float, NDArray ]:
+        """
+        Maps device stamps onto the now() time base
+        :param device_time: Stamp(s) of the device clock (in device ticks)
+        """
+        offset, rate, origin = self.estimate()
+        if isinstance(device_time,np.ndarray):
+            device_time = device_time.astype( np.float64 )
+        return EPOCH + offset + rate * ( ( device_time - origin ) * self.device_scale )
+
+    def align(
+        self,
+        device_time : float,
+        host_time   : Optional[float] = None,
+    ) -> float:
+        """
+        Records a device stamp received now and returns it mapped onto the now() time base
+        :param device_time: Stamp of the device clock (in device ticks)
+        :param host_time: Stamp on the now() time base the device stamp was received at (defaults to the current time)
+        """
+        self.observe( device_time, host_time )
+        return self.to_host( device_time )
+
+    @property
+    def drift( self ) -> float:
+        """
+        Drift of the device clock in parts per million (positive when the device clock runs slow)
+        """
+        _, rate, _ = self.estimate()
+        return ( rate - 1.0 ) * 1e6
@@ -0,0 +1,157 @@
+import numpy as np
+from threading                  import Lock
+from typing                     import Optional, Dict, Tuple, Hashable
+from numpy.typing               import NDArray
+from rohan.common.type_aliases  import Resolution, Intrinsics, ROI
+from rohan.utils.buffer_pool    import BufferPool, Lease
+
+"""
+Deprojection of depth images into point clouds through cached per-pixel ray tables
+-- resolutions are (width, height), intrinsics are pinhole (fx, fy, cx, cy) in pixels, and regions of interest are (x, y, width, height)
+"""
+
+_ray_tables         : Dict[Hashable,NDArray] = {}
+_ray_tables_lock    = Lock()
+
+
+def _window(
+    resolution  : Resolution,
+    stride      : int,
+    roi         : Optional[ROI],
+) -> Tuple[slice,slice]:
+    """
+    Row and column slices of the pixels kept by a strided region of interest
+    """
+    if stride < 1:
+        raise ValueError(f"Decimation stride must be a positive integer: Provided {stride}")
+    width, height = resolution
+    x, y, w, h = (0, 0, width, height) if roi is None else roi
+    if x < 0 or y < 0 or w <= 0 or h <= 0 or x + w > width or y + h > height:
+        raise ValueError(f"Region of interest {roi} does not fit within resolution {resolution}")
+    return slice( y, y+h, stride ), slice( x, x+w, stride )
+
+
+def ray_table(
+    resolution  : Resolution,
+    intrinsics  : Intrinsics,
+    stride      : int               = 1,
+    roi         : Optional[ROI]     = None,
+    depth_scale : float             = 1.0,
+) -> NDArray:
+    """
+    Table of per-pixel rays scaled such that multiplying by a raw depth value yields the 3D point
+    -- rays have unit z-component (depth measured along the optical axis) and fold in depth_scale, so deprojection is a single multiply.
+    One full-resolution table is cached per (resolution, intrinsics, depth_scale), and strided or cropped tables are views into it
+    :param resolution: (width, height) of the depth image
+    :param intrinsics: Pinhole intrinsics (fx, fy, cx, cy) of the depth image
+    :param stride: Integer decimation of rows and columns
+    :param roi: Optional region of interest (x, y, width, height) in pixels of the full resolution
+    :param depth_scale: Conversion of raw depth values to metric depth
+    :returns Read-only float32 array of shape (rows, columns, 3)
+    """
+    rows, cols  = _window( resolution, stride, roi )
+    key         = ( tuple(resolution), tuple( float(value) for value in intrinsics ), float(depth_scale) )
+    table       = _ray_tables.get(key)
+    if table is None:
+        width, height   = resolution
+        fx, fy, cx, cy  = intrinsics
+        v, u            = np.mgrid[ 0:height, 0:width ]
+        table           = np.empty( ( height, width, 3 ), dtype=np.float32 )
+        table[...,0]    = ( u - cx ) * ( depth_scale / fx )
+        table[...,1]    = ( v - cy ) * ( depth_scale / fy )
+        table[...,2]    = depth_scale
+        table.flags.writeable = False
+        with _ray_tables_lock:
+            table = _ray_tables.setdefault( key, table )
+    return table[ rows, cols ]
+
+
+def clear_ray_tables() -> None:
+    """
+    Drops every cached ray table
+    """
+    with _ray_tables_lock:
+        _ray_tables.clear()
+
+
+class DepthProjector:
+
+    """
+    Projects depth frames into point clouds written to a reused output buffer
+    -- the buffer is sized for the most recent stride and region of interest, and replaced (returning a leased one to its pool) when
+    they change
+    :param resolution: (width, height) of the depth image
+    :param intrinsics: Pinhole intrinsics (fx, fy, cx, cy) of the depth image
+    :param depth_scale: Conversion of raw depth values to metric depth
+    :param buffer_pool: Optional pool the output buffer is leased from (held until replaced or release())
+    """
+
+    resolution  : Resolution
+    intrinsics  : Intrinsics
+    depth_scale : float
+    buffer_pool : Optional[BufferPool] = None
+
+    def __init__(
+        self,
+        resolution  : Resolution,
+        intrinsics  : Intrinsics,
+        depth_scale : float                 = 1.0,
+        buffer_pool : Optional[BufferPool]  = None,
+    ):
+        self.resolution     = resolution
+        self.intrinsics     = intrinsics
+        self.depth_scale    = depth_scale
+        self.buffer_pool    = buffer_pool
+        self._key           : Optional[Hashable] = None
+        self._buffer        : Optional[NDArray] = None
+        self._lease         : Optional[Lease] = None
+
+    def project(
+        self,
+        depth   : NDArray,
+        stride  : int               = 1,
+        roi     : Optional[ROI]     = None,
+        out     : Optional[NDArray] = None,
+    ) -> NDArray:
+        """
+        Deprojects a depth frame with one vectorized multiply
+        -- without out, the returned buffer is owned by the projector and overwritten by the next call
+        :param depth: Depth frame of shape (height, width)
+        :param stride: Integer decimation of rows and columns
+        :param roi: Optional region of interest (x, y, width, height) in pixels
+        :param out: Optional float32 output array of shape (n_points, 3)
+        :returns Point cloud of shape (n_points, 3) in row-major pixel order
+        """
+        width, height = self.resolution
+        if depth.shape[:2] != (height, width):
+            raise ValueError(f"Depth frame of shape {depth.shape} does not match resolution {self.resolution}")
+        rays        = ray_table( self.resolution, self.intrinsics, stride=stride, roi=roi, depth_scale=self.depth_scale )
+        rows, cols  = _window( self.resolution, stride, roi )
+        n_points    = rays.shape[0] * rays.shape[1]
+
+        if out is None:
+            key = ( stride, None if roi is None else tuple(roi), self.buffer_pool )
+            if key != self._key:
+                self.release()
+                if self.buffer_pool is not None:
+                    self._lease     = self.buffer_pool.lease( ( n_points, 3 ), np.float32 )
+                    self._buffer    = self._lease.array
+                else:
+                    self._buffer    = np.empty( ( n_points, 3 ), dtype=np.float32 )
+                self._key = key
+            out = self._buffer
+        elif out.shape != ( n_points, 3 ) or out.dtype != np.float32 or not out.flags.c_contiguous:
+            raise ValueError(f"Output buffer must be a contiguous float32 array of shape {( n_points, 3 )}")
+
+        np.multiply( rays, depth[ rows, cols, np.newaxis ], out=out.reshape( rays.shape ) )
+        return out
+
+    def release( self ) -> None:
+        """
+        Drops the projector's output buffer, returning a leased one to its pool
+        """
+        if self._lease is not None:
+            self._lease.release()
+        self._key       = None
+        self._buffer    = None
+        self._lease     = None
@@ -0,0 +1,28 @@
+import numpy as np
+from typing     import Any, Hashable
+
+"""
+Hashable keys built from configuration values, shared by rohan's caches and registries
+"""
+
+
+def freeze( value : Any ) -> Hashable:
+    """
+    Converts mappings, sequences, sets and arrays into hashable keys -- equal values yield equal keys regardless of container type
+    (e.g. a list and an array of the same numbers), and values which cannot be hashed otherwise are keyed by their representation
+    """
+    if isinstance(value,dict):
+        # >> NOTE: Entries are ordered by the representation of their frozen key, so keys of mixed types (e.g. 1 and "1") stay
+        # distinct and still sort
+        return tuple( sorted( ( ( freeze(key), freeze(item) ) for key, item in value.items() ), key=lambda entry: repr(entry[0]) ) )
+    if isinstance(value,np.ndarray):
+        return freeze( value.tolist() )
+    if isinstance(value,(list,tuple)):
+        return tuple( freeze(item) for item in value )
+    if isinstance(value,(set,frozenset)):
+        return frozenset( freeze(item) for item in value )
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ( type(value).__name__, repr(value) )
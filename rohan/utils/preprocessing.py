@@ -0,0 +1,214 @@
+import numpy as np
+from dataclasses                import dataclass
+from typing                     import Optional, List, Sequence, Tuple, Union
+from numpy.typing               import NDArray, DTypeLike
+from rohan.common.type_aliases  import Resolution, ROI
+from rohan.utils.buffer_pool    import BufferPool, Lease
+
+"""
+Declarative frame preprocessing compiled once per resolution and run into pooled buffers
+-- resolutions are (width, height), frames are (height, width) or (height, width, channels) arrays and regions of interest are (x, y, width, height)
+"""
+
+
+@dataclass(frozen=True)
+class Crop:
+    """
+    Keeps a region of interest (x, y, width, height) of the frame
+    """
+    roi : ROI
+
+
+@dataclass(frozen=True)
+class Decimate:
+    """
+    Keeps every factor-th row and column of the frame
+    """
+    factor : int
+
+
+@dataclass(frozen=True)
+class ChannelReorder:
+    """
+    Reorders (or selects) the frame's channels, e.g. (2,1,0) for BGR to RGB
+    """
+    order : Tuple[int,...]
+
+
+@dataclass(frozen=True)
+class Normalize:
+    """
+    Converts the frame to dtype then applies (frame * scale) + offset, e.g. scale=1/255 for uint8 to unit range
+    """
+    scale   : float         = 1.0 / 255.0
+    offset  : float         = 0.0
+    dtype   : DTypeLike     = np.float32
+
+
+PreprocessingStep = Union[ Crop, Decimate, ChannelReorder, Normalize ]
+
+
+class CompiledPipeline:
+
+    """
+    Preprocessing chain compiled for a fixed input shape and dtype -- every call writes into the next buffer of a preallocated ring
+    :param steps: Preprocessing steps in order of application
+    :param input_shape: Shape of incoming frames
+    :param input_dtype: Dtype of incoming frames
+    :param pool_size: Number of output buffers cycled through -- a returned frame stays valid for pool_size - 1 further calls only, so
+    consumers falling further behind must copy it
+    :param buffer_pool: Optional pool the output buffers are leased from (returned by release())
+    """
+
+    input_shape     : Tuple[int,...]
+    input_dtype     : np.dtype
+    output_shape    : Tuple[int,...]
+    output_dtype    : np.dtype
+    buffers         : List[NDArray]
+    buffer_pool     : Optional[BufferPool]
+    last_lease      : Optional[Lease]
+
+    def __init__(
+        self,
+        steps       : Sequence[PreprocessingStep],
+        input_shape : Tuple[int,...],
+        input_dtype : DTypeLike,
+        pool_size   : int                   = 3,
+        buffer_pool : Optional[BufferPool]  = None,
+    ):
+        if len(input_shape) not in (2,3):
+            raise ValueError(f"Frames must be of shape (height, width) or (height, width, channels): Provided {input_shape}")
+        if pool_size < 1:
+            raise ValueError(f"Pipeline requires at least one output buffer: Provided {pool_size}")
+        self.input_shape    = tuple(input_shape)
+        self.input_dtype    = np.dtype(input_dtype)
+
+        # >> NOTE: Crops and decimations compose into one strided view, so they never touch memory
+        height, width = input_shape[:2]
+        row_start, row_stop, col_start, col_stop, stride = 0, height, 0, width, 1
+        self.order      : Optional[Tuple[int,...]]  = None
+        self.normalize  : Optional[Normalize]       = None
+        for step in steps:
+            if isinstance(step,Crop):
+                x, y, w, h  = step.roi
+                rows        = ( row_stop - row_start + stride - 1 ) // stride
+                cols        = ( col_stop - col_start + stride - 1 ) // stride
+                if x < 0 or y < 0 or w <= 0 or h <= 0 or x + w > cols or y + h > rows:
+                    raise ValueError(f"Crop {step.roi} does not fit within the {cols}x{rows} frame it is applied to")
+                row_start, row_stop = row_start + y*stride, row_start + (y+h)*stride
+                col_start, col_stop = col_start + x*stride, col_start + (x+w)*stride
+            elif isinstance(step,Decimate):
+                if step.factor < 1:
+                    raise ValueError(f"Decimation factor must be a positive integer: Provided {step.factor}")
+                stride *= step.factor
+            elif isinstance(step,ChannelReorder):
+                if len(input_shape) != 3:
+                    raise ValueError("Channel reordering requires frames with a channel dimension")
+                # >> NOTE: Chained reorders index the channels left by the previous reorder, not those of the input
+                n_channels = len(self.order) if self.order is not None else input_shape[2]
+                if any( channel < 0 or channel >= n_channels for channel in step.order ):
+                    raise ValueError(f"Channel order {step.order} does not fit {n_channels} channels")
+                self.order = tuple(step.order) if self.order is None else tuple( self.order[channel] for channel in step.order )
+            elif isinstance(step,Normalize):
+                if self.normalize is not None:
+                    raise ValueError("Pipeline may hold a single Normalize step")
+                self.normalize = step
+            else:
+                raise TypeError(f"Unknown preprocessing step {step}")
+            if self.normalize is not None and not isinstance(step,Normalize):
+                raise ValueError("Normalize must be the last preprocessing step")
+
+        self.rows           = slice( row_start, row_stop, stride )
+        self.cols           = slice( col_start, col_stop, stride )
+        out_rows            = len( range( row_start, row_stop, stride ) )
+        out_cols            = len( range( col_start, col_stop, stride ) )
+        channels            = () if len(input_shape) == 2 else ( len(self.order) if self.order is not None else input_shape[2], )
+        self.output_shape   = ( out_rows, out_cols ) + channels
+        self.output_dtype   = np.dtype( self.normalize.dtype ) if self.normalize is not None else self.input_dtype
+        self.buffer_pool    = buffer_pool
+        self.last_lease     = None
+        self.leases         : List[Lease] = []
+        if buffer_pool is not None:
+            self.leases     = [ buffer_pool.lease( self.output_shape, self.output_dtype ) for _ in range(pool_size) ]
+            self.buffers    = [ lease.array for lease in self.leases ]
+        else:
+            self.buffers    = [ np.empty( self.output_shape, dtype=self.output_dtype ) for _ in range(pool_size) ]
+        self._next          = 0
+
+    def release( self ) -> None:
+        """
+        Returns leased output buffers to their pool -- the pipeline must not be called afterwards
+        """
+        for lease in self.leases:
+            lease.release()
+        self.leases     = []
+        self.buffers    = []
+        self.last_lease = None
+
+    def __call__(
+        self,
+        frame : NDArray
+    ) -> NDArray:
+        """
+        Runs the compiled chain without allocating
+        :param frame: Incoming frame of the compiled shape and dtype
+        :returns Preprocessed frame held in the pipeline's buffer ring (its lease, if pooled, is left in last_lease)
+        """
+        if frame.shape != self.input_shape:
+            raise ValueError(f"Frame of shape {frame.shape} does not match the compiled shape {self.input_shape}")
+        out             = self.buffers[self._next]
+        self.last_lease = self.leases[self._next] if self.leases else None
+        self._next      = ( self._next + 1 ) % len(self.buffers)
+
+        view = frame[ self.rows, self.cols ]
+        if self.order is None:
+            np.copyto( out, view, casting="unsafe" )
+        else:
+            for channel, source in enumerate(self.order):
+                np.copyto( out[...,channel], view[...,source], casting="unsafe" )
+        if self.normalize is not None:
+            if self.normalize.scale != 1.0:
+                np.multiply( out, self.normalize.scale, out=out, casting="unsafe" )
+            if self.normalize.offset != 0.0:
+                np.add( out, self.normalize.offset, out=out, casting="unsafe" )
+        return out
+
+
+class FramePipeline:
+
+    """
+    Declarative preprocessing chain attached to cameras -- compiled on the first frame against the camera's resolution
+    :param steps: Preprocessing steps in order of application (Crop, Decimate, ChannelReorder, then optionally Normalize)
+    :param pool_size: Number of output buffers cycled through by the compiled pipeline -- a published frame is overwritten once
+    pool_size - 1 further frames were published, so process() must finish reading (or copy) it by then
+    """
+
+    steps       : Tuple[PreprocessingStep,...]
+    pool_size   : int
+
+    def __init__(
+        self,
+        steps       : Sequence[PreprocessingStep],
+        pool_size   : int = 3,
+    ):
+        self.steps      = tuple(steps)
+        self.pool_size  = pool_size
+
+    def compile(
+        self,
+        resolution  : Resolution,
+        channels    : Optional[int]         = 3,
+        dtype       : DTypeLike             = np.uint8,
+        buffer_pool : Optional[BufferPool]  = None,
+    ) -> CompiledPipeline:
+        """
+        Compiles the chain for frames of a given resolution
+        :param resolution: (width, height) of incoming frames
+        :param channels: Number of channels of incoming frames (None for frames without a channel dimension)
+        :param dtype: Dtype of incoming frames
+        :param buffer_pool: Optional pool the output buffers are leased from
+        :returns Compiled pipeline
+        """
+        width, height = resolution
+        shape = ( height, width ) if channels is None else ( height, width, channels )
+        return CompiledPipeline( self.steps, input_shape=shape, input_dtype=dtype, pool_size=self.pool_size, buffer_pool=buffer_pool )
@@ -0,0 +1,111 @@
+from dataclasses                import dataclass
+from typing                     import Optional, List, Sequence
+from rohan.common.type_aliases  import ROI
+
+"""
+Adaptive quality control stepping along a ladder of processing levels to keep a loop within its deadline
+"""
+
+
+@dataclass
+class QualityLevel:
+    """
+    Single rung of a quality ladder
+    :param name: Name of the level used when logging transitions
+    :param camera_decimation: Integer decimation applied to every camera's preprocessed frames
+    :param camera_roi: Optional region of interest (x, y, width, height) cropped from every camera's preprocessed frames
+    :param process_every: Run process() only on every Nth tick
+    :param skip_guidance: Withhold guidance from process() (passing None)
+    :param skip_navigation: Withhold navigation from process() (passing None)
+    """
+    name                : str           = "full"
+    camera_decimation   : int           = 1
+    camera_roi          : Optional[ROI] = None
+    process_every       : int           = 1
+    skip_guidance       : bool          = False
+    skip_navigation     : bool          = False
+
+
+class AdaptiveQuality:
+
+    """
+    Watches loop timing and steps down the quality ladder while over budget, back up while there is headroom
+    -- the cost of a level is the smoothed duration of process() divided by the level's process_every
+    :param ladder: Quality levels ordered from highest to lowest quality
+    :param budget: Time budget of a single tick (typically the stack's spin_intrvl)
+    :param smoothing: Weight of the newest observation in the exponential moving average of durations
+    :param degrade_after: Consecutive over-budget observations before stepping down
+    :param recover_after: Consecutive observations within headroom before stepping up
+    :param headroom: Fraction of the budget the cost must stay under to count towards stepping up
+    """
+
+    ladder          : List[QualityLevel]
+    budget          : float
+    index           : int = 0
+    average         : Optional[float] = None
+    transitions     : int = 0
+
+    def __init__(
+        self,
+        ladder          : Sequence[QualityLevel],
+        budget          : float,
+        smoothing       : float = 0.2,
+        degrade_after   : int   = 5,
+        recover_after   : int   = 50,
+        headroom        : float = 0.6,
+    ):
+        if len(ladder) == 0:
+            raise ValueError("Quality ladder requires at least one level")
+        if budget <= 0:
+            raise ValueError(f"Quality budget must be positive: Provided {budget}")
+        self.ladder         = list(ladder)
+        self.budget         = budget
+        self.smoothing      = smoothing
+        self.degrade_after  = degrade_after
+        self.recover_after  = recover_after
+        self.headroom       = headroom
+        self.index          = 0
+        self.average        = None
+        self.transitions    = 0
+        self._over          = 0
+        self._under         = 0
+
+    @property
+    def level( self ) -> QualityLevel:
+        return self.ladder[self.index]
+
+    @property
+    def cost( self ) -> Optional[float]:
+        """
+        Smoothed cost per tick of the current level
+        """
+        return None if self.average is None else self.average / self.level.process_every
+
+    def observe( self, duration : float ) -> bool:
+        """
+        Records the duration of a process() call and steps along the ladder when needed
+        :param duration: Duration of the call
+        :returns True if the level changed
+        """
+        self.average = duration if self.average is None else self.average + self.smoothing * ( duration - self.average )
+        cost = self.cost
+        if cost > self.budget:
+            self._over, self._under = self._over + 1, 0
+            if self._over >= self.degrade_after and self.index < len(self.ladder) - 1:
+                return self._step( +1 )
+        elif cost < self.headroom * self.budget:
+            self._over, self._under = 0, self._under + 1
+            if self._under >= self.recover_after and self.index > 0:
+                return self._step( -1 )
+        else:
+            self._over, self._under = 0, 0
+        return False
+
+    def _step( self, direction : int ) -> bool:
+        self.index          += direction
+        self.transitions    += 1
+        self._over          = 0
+        self._under         = 0
+        # >> NOTE: Durations measured at the previous level no longer describe the load, so smoothing starts over
+        self.average        = None
+        return True
@@ -0,0 +1,205 @@
+import os
+import threading
+from dataclasses    import dataclass
+from typing         import Optional, List, Dict, Any, Union
+
+"""
+Per-thread scheduling policies (core pinning, niceness, real-time priority) and a report of where threads actually ran
+-- the underlying calls are Linux specific, so on other platforms policies are recorded but not applied
+"""
+
+
+@dataclass
+class ThreadPolicy:
+    """
+    Scheduling policy applied by a thread to itself when it starts
+    :param cpus: Cores the thread is pinned to (None leaves the affinity untouched)
+    :param nice: Niceness of the thread (negative values usually require elevated privileges)
+    :param fifo_priority: SCHED_FIFO real-time priority (1-99) of the thread where permitted
+    """
+    cpus            : Optional[List[int]]   = None
+    nice            : Optional[int]         = None
+    fifo_priority   : Optional[int]         = None
+
+
+@dataclass
+class _ThreadRecord:
+    """
+    Bookkeeping of a thread spun off by rohan
+    """
+    name        : str
+    thread      : threading.Thread
+    native_id   : Optional[int]
+    policy      : Optional[ThreadPolicy]
+    errors      : List[str]
+
+
+_thread_records         : Dict[int,_ThreadRecord] = {}
+_thread_records_lock    = threading.Lock()
+
+
+def apply_thread_policy(
+    policy : Optional[ Union[ ThreadPolicy, Dict[str,Any] ] ]
+) -> List[str]:
+    """
+    Applies a scheduling policy to the calling thread and records the thread for thread_report()
+    :param policy: Policy to apply, or a mapping of its fields (None only records the thread)
+    :returns Descriptions of the parts of the policy which could not be applied
+    """
+    thread      = threading.current_thread()
+    native_id   = threading.get_native_id()
+    errors      = []
+    try:
+        policy = as_thread_policy( policy )
+    except TypeError as e:
+        errors.append( str(e) )
+        policy = None
+    if policy is not None:
+        if policy.cpus is not None:
+            try:
+                os.sched_setaffinity( 0, policy.cpus )
+            except ( AttributeError, OSError, ValueError ) as e:
+                errors.append( f'core pinning to {policy.cpus} failed ({e})' )
+        if policy.nice is not None:
+            try:
+                os.setpriority( os.PRIO_PROCESS, native_id, policy.nice )
+            except ( AttributeError, OSError ) as e:
+                errors.append( f'setting niceness {policy.nice} failed ({e})' )
+        if policy.fifo_priority is not None:
+            try:
+                os.sched_setscheduler( 0, os.SCHED_FIFO, os.sched_param( policy.fifo_priority ) )
+            except ( AttributeError, OSError ) as e:
+                errors.append( f'SCHED_FIFO priority {policy.fifo_priority} failed ({e})' )
+    with _thread_records_lock:
+        _thread_records[native_id] = _ThreadRecord( thread.name, thread, native_id, policy, errors )
+    return errors
+
+
+@dataclass
+class ThreadScheduling:
+    """
+    Scheduling state of a thread captured before a policy is applied to it, so it can be restored afterwards
+    """
+    native_id   : int
+    affinity    : Optional[List[int]]
+    nice        : Optional[int]
+    scheduler   : Optional[int]
+    priority    : Optional[int]
+
+
+def as_thread_policy( policy : Any ) -> Optional[ThreadPolicy]:
+    """
+    Converts a policy given as a mapping (e.g. loaded from JSON or YAML) into a ThreadPolicy
+    :raises TypeError: if the policy is neither a ThreadPolicy, a mapping of its fields nor None
+    """
+    if policy is None or isinstance(policy,ThreadPolicy):
+        return policy
+    if isinstance(policy,dict):
+        try:
+            return ThreadPolicy( **policy )
+        except TypeError as e:
+            raise TypeError(f"Invalid thread policy {policy}: {e}") from None
+    raise TypeError(f"Thread policies must be ThreadPolicy instances or mappings of their fields: Provided {type(policy)}")
+
+
+def capture_thread_scheduling() -> ThreadScheduling:
+    """
+    Captures the calling thread's affinity, niceness and scheduling policy (fields which cannot be read are None)
+    """
+    native_id   = threading.get_native_id()
+    captured    = ThreadScheduling( native_id, None, None, None, None )
+    try:
+        captured.affinity   = sorted( os.sched_getaffinity( 0 ) )
+        captured.nice       = os.getpriority( os.PRIO_PROCESS, native_id )
+        captured.scheduler  = os.sched_getscheduler( 0 )
+        captured.priority   = os.sched_getparam( 0 ).sched_priority
+    except ( AttributeError, OSError ):
+        pass
+    return captured
+
+
+def restore_thread_scheduling( captured : ThreadScheduling ) -> List[str]:
+    """
+    Restores scheduling captured by capture_thread_scheduling() on the calling thread and drops it from thread_report()
+    :returns Descriptions of the parts which could not be restored
+    """
+    errors = []
+    if captured.scheduler is not None:
+        try:
+            os.sched_setscheduler( 0, captured.scheduler, os.sched_param( captured.priority ) )
+        except ( AttributeError, OSError ) as e:
+            errors.append( f'restoring scheduler failed ({e})' )
+    if captured.nice is not None:
+        try:
+            os.setpriority( os.PRIO_PROCESS, captured.native_id, captured.nice )
+        except ( AttributeError, OSError ) as e:
+            errors.append( f'restoring niceness {captured.nice} failed ({e})' )
+    if captured.affinity is not None:
+        try:
+            os.sched_setaffinity( 0, captured.affinity )
+        except ( AttributeError, OSError ) as e:
+            errors.append( f'restoring affinity {captured.affinity} failed ({e})' )
+    with _thread_records_lock:
+        _thread_records.pop( captured.native_id, None )
+    return errors
+
+
+def _last_cpu( native_id : int ) -> Optional[int]:
+    """
+    Core a thread last ran on, read from procfs
+    """
+    try:
+        with open( f"/proc/self/task/{native_id}/stat" ) as file:
+            stat = file.read()
+    except OSError:
+        return None
+    # >> NOTE: The command name may hold spaces, so fields are counted from the closing parenthesis (processor is field 39)
+    fields = stat[ stat.rindex(")") + 2 : ].split()
+    return int( fields[36] ) if len(fields) > 36 else None
+
+
+def thread_report() -> List[Dict[str,Any]]:
+    """
+    Reports the scheduling of every live thread spun off by rohan
+    :returns List of dictionaries holding the name, native id, requested policy, actual affinity, niceness, scheduling policy,
+    last core the thread ran on and any errors raised while applying its policy
+    """
+    with _thread_records_lock:
+        for native_id in [ native_id for native_id, record in _thread_records.items() if not record.thread.is_alive() ]:
+            del _thread_records[native_id]
+        records = list( _thread_records.values() )
+
+    report = []
+    for record in records:
+        entry = {
+            "name"          : record.name,
+            "native_id"     : record.native_id,
+            "policy"        : record.policy,
+            "affinity"      : None,
+            "nice"          : None,
+            "scheduler"     : None,
+            "last_cpu"      : _last_cpu( record.native_id ),
+            "errors"        : record.errors,
+        }
+        try:
+            entry["affinity"]   = sorted( os.sched_getaffinity( record.native_id ) )
+            entry["nice"]       = os.getpriority( os.PRIO_PROCESS, record.native_id )
+            scheduler           = os.sched_getscheduler( record.native_id )
+            entry["scheduler"]  = { os.SCHED_FIFO : "SCHED_FIFO", os.SCHED_RR : "SCHED_RR" }.get( scheduler, "SCHED_OTHER" )
+        except ( AttributeError, OSError ):
+            pass
+        report.append( entry )
+    return report
+
+
+def format_thread_report() -> str:
+    """
+    Human readable form of thread_report()
+    """
+    lines = [ "thread report:" ]
+    for entry in thread_report():
+        lines.append(
+            f"  {entry['name']} (tid {entry['native_id']}) -> last cpu {entry['last_cpu']}, affinity {entry['affinity']}, "
+            f"nice {entry['nice']}, {entry['scheduler']}" + ( f", errors: {entry['errors']}" if entry['errors'] else "" )
+        )
+    return "\n".join(lines)
@@ -1,5 +1,6 @@
-from time       import perf_counter, sleep
-from typing     import Optional
+from time               import sleep
+from rohan.utils.clock  import now
+from typing             import Optional
 
 class IntervalTimer:
 
@@ -21,9 +22,9 @@ class IntervalTimer:
         Waits for the target interval to pass then updates last read time
         """
         if not self.last_tick is None:
-            delta_t = perf_counter() - self.last_tick
+            delta_t = now() - self.last_tick
             if delta_t < self.interval : sleep( self.interval - delta_t )
-        self.last_tick = perf_counter()
+        self.last_tick = now()
 
     def check_interval( self ) -> bool:
         """
@@ -31,7 +32,54 @@ class IntervalTimer:
         :returns True if more time has passed since last call than interval, False otherwise 
         """
         if not self.last_tick is None:
-            if perf_counter() - self.last_tick < self.interval :
+            if now() - self.last_tick < self.interval :
                 return False
-        self.last_tick = perf_counter()
-        return True 
\ No newline at end of file
+        self.last_tick = now()
+        return True 
+
+class DeadlineTimer:
+
+    """
+    Timer for running loops at a fixed rate -- deadlines are scheduled on an absolute grid so sleep jitter does not accumulate into drift
+    :param interval: Target interval between deadlines
+    """
+
+    next_deadline   : Optional[float] = None
+    overruns        : int = 0
+    max_lateness    : float = 0.0
+
+    def __init__( 
+        self, 
+        interval : float 
+    ): 
+        self.interval       = interval
+        self.overruns       = 0
+        self.max_lateness   = 0.0
+
+    def reset( self ):
+        """
+        Restarts the deadline grid from the current time
+        """
+        self.next_deadline = None
+
+    def await_deadline( self ) -> float:
+        """
+        Waits for the next deadline on the grid -- if the deadline has already passed, the overrun is counted and the grid skips forward
+        :returns Lateness of this call with respect to its deadline (0 if on time)
+        """
+        current = now()
+        if self.next_deadline is None or self.interval <= 0:
+            self.next_deadline = current + max(self.interval,0.0)
+            return 0.0
+
+        lateness = current - self.next_deadline
+        if lateness <= 0:
+            sleep( -lateness )
+            lateness = 0.0
+            self.next_deadline += self.interval
+        else:
+            self.overruns       += 1
+            self.max_lateness   = max( self.max_lateness, lateness )
+            missed              = int( lateness // self.interval ) + 1
+            self.next_deadline += missed * self.interval
+        return lateness
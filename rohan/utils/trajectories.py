@@ -0,0 +1,228 @@
+import numpy as np
+from collections       import OrderedDict
+from threading         import Lock
+from typing            import Optional, Dict, Any, Hashable, Callable
+from numpy.typing      import NDArray, ArrayLike
+from rohan.utils.keys  import freeze
+
+
+class Trajectory:
+
+    """
+    Time-parameterized trajectory precomputed into contiguous arrays
+    -- samples on a uniform time grid are looked up in O(1), non-uniform samples by bisection in O(log n)
+    :param points: Setpoints of shape (n_samples, n_dims)
+    :param dt: Time between samples of a uniform grid (ignored when times are provided)
+    :param t0: Time of the first sample of a uniform grid (ignored when times are provided)
+    :param times: Optional strictly increasing sample times of shape (n_samples,)
+    """
+
+    points  : NDArray
+    times   : NDArray
+    dt      : Optional[float]
+    t0      : float
+
+    def __init__(
+        self,
+        points  : ArrayLike,
+        dt      : Optional[float]       = None,
+        t0      : float                 = 0.0,
+        times   : Optional[ArrayLike]   = None,
+    ):
+        points = np.ascontiguousarray( points, dtype=np.float64 )
+        if points.ndim == 1:
+            points = points.reshape(-1,1)
+        if points.shape[0] < 1:
+            raise ValueError("Trajectory requires at least one sample")
+
+        if times is None:
+            if dt is None or dt <= 0:
+                raise ValueError("Trajectory requires either a positive dt or explicit sample times")
+            self.dt     = float(dt)
+            self.t0     = float(t0)
+            self.times  = self.t0 + self.dt * np.arange( points.shape[0], dtype=np.float64 )
+        else:
+            self.times  = np.ascontiguousarray( times, dtype=np.float64 )
+            if self.times.shape != points.shape[:1]:
+                raise ValueError(f"Trajectory times of shape {self.times.shape} do not match {points.shape[0]} samples")
+            if np.any( np.diff(self.times) <= 0 ):
+                raise ValueError("Trajectory times must be strictly increasing")
+            self.dt     = None
+            self.t0     = float(self.times[0])
+
+        self.points = points
+        # >> NOTE: Differences are precomputed so sampling is a single fused multiply-add
+        self._deltas = np.ascontiguousarray( np.diff( points, axis=0 ) )
+
+    def __len__( self ) -> int:
+        return self.points.shape[0]
+
+    @property
+    def n_dims( self ) -> int:
+        return self.points.shape[1]
+
+    @property
+    def duration( self ) -> float:
+        return float( self.times[-1] - self.times[0] )
+
+    def sample(
+        self,
+        t   : float,
+        out : Optional[NDArray] = None,
+    ) -> NDArray:
+        """
+        Linearly interpolated setpoint at time t (clamped to the ends of the trajectory)
+        :param t: Query time on the trajectory's time base
+        :param out: Optional preallocated array of shape (n_dims,) to write the setpoint into
+        :returns Setpoint of shape (n_dims,)
+        """
+        n = self.points.shape[0]
+        if n == 1 or t <= self.t0:
+            index, frac = 0, 0.0
+        elif t >= self.times[-1]:
+            index, frac = n-1, 0.0
+        elif self.dt is not None:
+            s       = ( t - self.t0 ) / self.dt
+            index   = min( int(s), n-2 )
+            frac    = s - index
+        else:
+            index   = int( np.searchsorted( self.times, t, side="right" ) ) - 1
+            frac    = ( t - self.times[index] ) / ( self.times[index+1] - self.times[index] )
+
+        if out is None:
+            out = np.empty( self.points.shape[1], dtype=np.float64 )
+        if frac == 0.0:
+            out[:] = self.points[index]
+        else:
+            np.multiply( self._deltas[index], frac, out=out )
+            out += self.points[index]
+        return out
+
+
+class TrajectoryCache:
+
+    """
+    Least-recently-used cache of precomputed trajectories keyed by (start, goal, constraints)
+    :param maxsize: Maximum number of trajectories kept (non-positive disables caching)
+    """
+
+    maxsize : int
+    hits    : int = 0
+    misses  : int = 0
+
+    def __init__(
+        self,
+        maxsize : int = 32,
+    ):
+        self.maxsize    = maxsize
+        self.hits       = 0
+        self.misses     = 0
+        self._entries   : "OrderedDict[Hashable,Trajectory]" = OrderedDict()
+        self._lock      = Lock()
+
+    def __len__( self ) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(
+        start       : ArrayLike,
+        goal        : ArrayLike,
+        constraints : Optional[Dict[str,Any]] = None,
+    ) -> Hashable:
+        """
+        Builds the hashable cache key of a trajectory request
+        """
+        return ( freeze(start), freeze(goal), freeze(constraints or {}) )
+
+    def get_or_plan(
+        self,
+        start       : ArrayLike,
+        goal        : ArrayLike,
+        planner     : Callable[...,Trajectory],
+        **constraints,
+    ) -> Trajectory:
+        """
+        Returns the cached trajectory for the request or plans, caches and returns a new one
+        -- cached trajectories are shared between callers, so their arrays are made read-only
+        :param start: Start setpoint
+        :param goal: Goal setpoint
+        :param planner: Callable of (start, goal, **constraints) returning a Trajectory
+        :returns Trajectory for the request
+        """
+        key = self.make_key( start, goal, constraints )
+        with self._lock:
+            trajectory = self._entries.get(key)
+            if trajectory is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return trajectory
+            self.misses += 1
+
+        trajectory = planner( start, goal, **constraints )
+        if self.maxsize > 0:
+            for array in ( trajectory.points, trajectory.times, trajectory._deltas ):
+                array.flags.writeable = False
+            with self._lock:
+                self._entries[key] = trajectory
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return trajectory
+
+    def clear( self ) -> None:
+        """
+        Drops every cached trajectory and resets statistics
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits   = 0
+            self.misses = 0
+
+    def stats( self ) -> Dict[str,float]:
+        """
+        Cache statistics
+        :returns Dictionary of hits, misses, hit rate, current size and maximum size
+        """
+        requests = self.hits + self.misses
+        return {
+            "hits"      : self.hits,
+            "misses"    : self.misses,
+            "hit_rate"  : self.hits / requests if requests > 0 else 0.0,
+            "size"      : len(self._entries),
+            "maxsize"   : self.maxsize,
+        }
+
+
+def min_jerk_trajectory(
+    start           : ArrayLike,
+    goal            : ArrayLike,
+    dt              : float,
+    duration        : Optional[float] = None,
+    max_velocity    : Optional[float] = None,
+) -> Trajectory:
+    """
+    Minimum-jerk (quintic) point-to-point trajectory sampled on a uniform time grid
+    :param start: Start setpoint
+    :param goal: Goal setpoint
+    :param dt: Time between samples
+    :param duration: Time to reach the goal
+    :param max_velocity: Peak velocity bound used to determine the duration when none is provided
+    :returns Trajectory starting at t=0
+    """
+    start   = np.asarray( start, dtype=np.float64 ).ravel()
+    goal    = np.asarray( goal, dtype=np.float64 ).ravel()
+    if start.shape != goal.shape:
+        raise ValueError(f"Start of shape {start.shape} does not match goal of shape {goal.shape}")
+    if duration is None:
+        if max_velocity is None or max_velocity <= 0:
+            raise ValueError("Either a duration or a positive max_velocity must be provided")
+        # >> NOTE: Peak velocity of a minimum-jerk profile is 15/8 of the average velocity
+        duration = 1.875 * float( np.max( np.abs( goal - start ) ) ) / max_velocity
+    if duration <= 0:
+        return Trajectory( points=goal.reshape(1,-1), dt=dt )
+
+    n_samples   = int( np.ceil( duration / dt ) ) + 1
+    tau         = np.minimum( np.arange( n_samples, dtype=np.float64 ) * dt / duration, 1.0 )
+    scale       = tau**3 * ( 10.0 - 15.0*tau + 6.0*tau**2 )
+    points      = start + np.outer( scale, goal - start )
+    return Trajectory( points=points, dt=dt )